@@ -70,6 +70,45 @@ DATABASES = {
     }
 }
 
+# Cache configuration
+# The "reports" cache holds generated compatibility reports. REPORT_CACHE_BACKEND picks
+# "file" (shared by all processes on one machine), "redis" (shared across machines; any
+# Redis-compatible server at REDIS_URL) or "locmem". Saves invalidate reports by writing
+# version tokens to this cache, which other worker processes never see with "locmem",
+# so only use it with a single process.
+REPORT_CACHE_BACKEND = os.environ.get('REPORT_CACHE_BACKEND', 'file')
+REPORT_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'compatibility-reports',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('REPORT_CACHE_LOCATION', os.path.join(BASE_DIR, 'report_cache')),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    },
+}
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'reports': {
+        **REPORT_CACHE_BACKENDS[REPORT_CACHE_BACKEND],
+        'TIMEOUT': int(os.environ.get('REPORT_CACHE_TIMEOUT', 3600)),
+    },
+}
+
+# LLM response cache
+# OpenAI replies are stored in a SQLite file, keyed by a hash of the model, messages and
+# parameters. Set LLM_CACHE_ENABLED=0 to always call the API.
+LLM_CACHE_ENABLED = os.environ.get('LLM_CACHE_ENABLED', '1') != '0'
+LLM_CACHE_PATH = os.environ.get('LLM_CACHE_PATH', os.path.join(BASE_DIR, 'llm_cache.sqlite3'))
+LLM_CACHE_TTL = int(os.environ.get('LLM_CACHE_TTL', 7 * 24 * 3600))
+LLM_CACHE_MAX_BYTES = int(os.environ.get('LLM_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
 # Logging configuration
 LOGGING = {
     'version': 1,
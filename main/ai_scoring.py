@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import re
+
+from django.conf import settings
+from openai import AsyncOpenAI
+
+from .llm_cache import achat_completion
+
+logger = logging.getLogger(__name__)
+
+OPENAI_SCORING_MODEL = getattr(settings, 'OPENAI_SCORING_MODEL', 'gpt-4')
+# Requests in flight at once, per grid
+OPENAI_SCORING_CONCURRENCY = getattr(settings, 'OPENAI_SCORING_CONCURRENCY', 8)
+# Seconds allowed for one call, and for a whole grid before unfinished cells are reported as timed out
+OPENAI_SCORING_TIMEOUT = getattr(settings, 'OPENAI_SCORING_TIMEOUT', 30)
+OPENAI_SCORING_DEADLINE = getattr(settings, 'OPENAI_SCORING_DEADLINE', 120)
+
+SCORE_PATTERN = re.compile(r'(\d+\.?\d*)')
+
+
+def score_messages(job_description, skills):
+    """Chat messages asking for a 0-100 compatibility score for one pair."""
+    return [
+        {"role": "system", "content": "You are an AI compatibility scorer."},
+        {"role": "user", "content": f"Score compatibility between job: {job_description} "
+                                    f"and employee with skills: {skills}. "
+                                    f"Return a score from 0 to 100."},
+    ]
+
+
+def parse_score(text):
+    """
+    Return the first number in a model reply as a float.
+
+    Raises:
+        ValueError: If the reply contains no number.
+    """
+    match = SCORE_PATTERN.search(text or "")
+    if not match:
+        raise ValueError("No valid score found in the API response.")
+    return float(match.group(1))
+
+
+def is_score(text):
+    """Return True if parse_score can read a score from a model reply."""
+    return SCORE_PATTERN.search(text or "") is not None
+
+
+def make_client(timeout=OPENAI_SCORING_TIMEOUT):
+    """AsyncOpenAI client for the configured key, and OPENAI_BASE_URL when set (e.g. a local fake server)."""
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=getattr(settings, 'OPENAI_BASE_URL', None),
+        timeout=timeout,
+        max_retries=getattr(settings, 'OPENAI_MAX_RETRIES', 1),
+    )
+
+
+async def complete_async(client, messages, model=OPENAI_SCORING_MODEL, semaphore=None, timeout=OPENAI_SCORING_TIMEOUT,
+                         bypass=False, cacheable=None):
+    """
+    Return the stripped text of one chat completion, answered from the LLM
+    response cache when possible, waiting on semaphore first when given.
+    cacheable is passed on to achat_completion.
+    """
+    async def call():
+        response = await asyncio.wait_for(
+            achat_completion(client, bypass=bypass, cacheable=cacheable, model=model, messages=messages),
+            timeout,
+        )
+        return response.strip()
+
+    if semaphore is None:
+        return await call()
+    async with semaphore:
+        return await call()
+
+
+async def score_pairs_async(pairs, client=None, model=OPENAI_SCORING_MODEL, concurrency=OPENAI_SCORING_CONCURRENCY,
+                            timeout=OPENAI_SCORING_TIMEOUT, deadline=OPENAI_SCORING_DEADLINE, bypass=False):
+    """
+    Score every pair concurrently, at most concurrency calls at a time.
+
+    Pairs with the same job description and skills share one call. A failed
+    call, or one unfinished when the deadline passes, does not stop the
+    others: its cell holds an error message instead of a score. Replies
+    without a score are not cached, so the next grid asks again.
+
+    Args:
+        pairs (dict): key -> (job_description, skills).
+        client (AsyncOpenAI): Client to use; one from make_client is created and closed otherwise.
+        bypass (bool): Call the API even for prompts in the LLM response cache.
+
+    Returns:
+        dict: key -> float score, or an "Error: ..." string.
+    """
+    if not pairs:
+        return {}
+
+    own_client = client is None
+    client = client or make_client(timeout)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    prompts = {}
+    for key, prompt in pairs.items():
+        prompts.setdefault(prompt, []).append(key)
+    tasks = {
+        asyncio.ensure_future(
+            complete_async(client, score_messages(*prompt), model, semaphore, timeout, bypass, cacheable=is_score)
+        ): prompt
+        for prompt in prompts
+    }
+
+    try:
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.warning(f"OpenAI scoring deadline passed with {len(pending)} of {len(tasks)} calls unfinished")
+    finally:
+        if own_client:
+            await client.close()
+
+    results = {}
+    for task, prompt in tasks.items():
+        if task.cancelled():
+            value = "Error: Timed out waiting for the compatibility score."
+        elif task.exception() is not None:
+            error = task.exception()
+            if isinstance(error, asyncio.TimeoutError):
+                value = "Error: Timed out waiting for the compatibility score."
+            else:
+                logger.error(f"OpenAI API error: {error}")
+                value = "Error: Unable to fetch compatibility score."
+        else:
+            try:
+                value = parse_score(task.result())
+            except ValueError as e:
+                value = f"Error: {e}"
+        for key in prompts[prompt]:
+            results[key] = value
+    return results
+
+
+def score_pairs(pairs, **options):
+    """Synchronous score_pairs_async for views; the grid's wall time is about its slowest batch of calls."""
+    return asyncio.run(score_pairs_async(pairs, **options))
+
+
+def complete(messages, model=OPENAI_SCORING_MODEL, timeout=OPENAI_SCORING_TIMEOUT, bypass=False):
+    """Return the text of one chat completion, for the single-pair report views."""
+    async def run():
+        async with make_client(timeout) as client:
+            return await complete_async(client, messages, model, timeout=timeout, bypass=bypass)
+
+    return asyncio.run(run())
@@ -0,0 +1,8 @@
+"""
+Benchmarks for the compatibility scoring engine.
+
+Run them with ``python manage.py benchmark_scoring``; see that command for
+sizes, output files and the baseline regression gate.
+"""
+from .generator import generate_jobs, generate_resumes
+from .runner import BENCHMARKS, compare_to_baseline, run_benchmarks
@@ -0,0 +1,93 @@
+import random
+
+from ..utils import create_education_lookup_table
+
+SKILL_POOL = [
+    "Python", "Java", "JavaScript", "TypeScript", "React", "Angular", "Node.js", "Django", "Flask",
+    "Spring Boot", "SQL", "MySQL", "PostgreSQL", "MongoDB", "Redis", "AWS", "Azure", "Google Cloud",
+    "Docker", "Kubernetes", "Git", "Linux", "C++", "C#", ".NET", "Go", "Rust", "PHP", "Laravel",
+    "HTML", "CSS", "Tailwind", "REST APIs", "GraphQL", "Machine Learning", "Deep Learning",
+    "Natural Language Processing", "TensorFlow", "PyTorch", "Pandas", "NumPy", "scikit-learn",
+    "Power BI", "Tableau", "Excel", "SAP", "Salesforce", "Selenium", "JIRA", "Agile", "Scrum",
+    "Communication", "Team Management", "Sales", "Digital Marketing", "SEO", "Accounting", "Tally",
+    "GST", "Recruitment", "Customer Service", "AutoCAD", "Embedded C", "VLSI", "MATLAB",
+]
+
+# Spellings seen in real postings that canonicalize to a skill above
+SKILL_VARIANTS = ["python", "JS", "ReactJS", "nodejs", "k8s", "Postgres", "ML", "sklearn", " Docker ", "AWS "]
+
+EDUCATION_TEMPLATES = [
+    "{degree}",
+    "{degree} in {field}",
+    "{degree}, {degree2}",
+    "{degree}/{degree2}",
+    "{degree} with specialization in {field}",
+    "Any Graduate",
+    "Any Postgraduate",
+    "Not Specified",
+]
+
+FIELDS = [
+    "Computer Science", "Computers", "Electronics", "Mechanical Engineering", "Civil Engineering",
+    "Information Technology", "Finance", "Marketing", "Commerce", "Physics", "Mathematics",
+]
+
+EXPERIENCE_TEMPLATES = [
+    "{low}-{high} years", "{low} to {high} yrs", "{low} years", "minimum {low}", "at least {low} years", "0", "",
+]
+
+
+def degree_strings():
+    """Degree spellings taken from the education lookup table, keys and full forms."""
+    lookup_table = create_education_lookup_table()
+    return sorted(set(lookup_table) | set(lookup_table.values()))
+
+
+def random_education(rng, degrees):
+    education = rng.choice(EDUCATION_TEMPLATES).format(
+        degree=rng.choice(degrees), degree2=rng.choice(degrees), field=rng.choice(FIELDS)
+    )
+    # Some postings write their requirements in capitals
+    return education.upper() if rng.random() < 0.1 else education
+
+
+def random_skills(rng, low, high):
+    skills = rng.sample(SKILL_POOL, rng.randint(low, high))
+    if rng.random() < 0.3:
+        skills.append(rng.choice(SKILL_VARIANTS))
+    return skills
+
+
+def generate_resumes(count, seed=0):
+    """
+    Build resume_details dicts like resume_details_from_features returns,
+    without the interned skill ids.
+    """
+    rng = random.Random(seed)
+    degrees = degree_strings()
+    return [
+        {
+            "education": random_education(rng, degrees),
+            "skills": random_skills(rng, 3, 12),
+            "experience_years": rng.randint(0, 15),
+        }
+        for _ in range(count)
+    ]
+
+
+def generate_jobs(count, seed=1):
+    """
+    Build job_details dicts like job_details_from_features returns, with the
+    raw experience text and no pre-parsed minimum.
+    """
+    rng = random.Random(seed)
+    degrees = degree_strings()
+    jobs = []
+    for _ in range(count):
+        low = rng.randint(0, 8)
+        jobs.append({
+            "education": random_education(rng, degrees),
+            "skills": random_skills(rng, 2, 8),
+            "experience": rng.choice(EXPERIENCE_TEMPLATES).format(low=low, high=low + rng.randint(1, 5)),
+        })
+    return jobs
@@ -0,0 +1,219 @@
+import gc
+import os
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+
+from ..scoring import build_education_matrix, build_experience_matrix, build_skill_matrices, score_matrix, skill_key_lists
+from ..utils import EDUCATION_MATCH_CACHE, _compare_education, compare_resume_with_job, extract_min_experience, normalize_education
+from .generator import generate_jobs, generate_resumes
+
+# Scalar benchmarks score at most this many pairs; their rate extrapolates
+SCALAR_SAMPLE_PAIRS = 2000
+
+
+@contextmanager
+def stage(stages, name):
+    """Add the wall time of the block to stages[name], in seconds."""
+    start = time.perf_counter()
+    yield
+    stages[name] = stages.get(name, 0.0) + time.perf_counter() - start
+
+
+def sample_pairs(resumes, jobs, limit=SCALAR_SAMPLE_PAIRS):
+    step = max(1, (len(resumes) * len(jobs)) // limit)
+    pairs = []
+    for index in range(0, len(resumes) * len(jobs), step):
+        pairs.append((resumes[index // len(jobs)], jobs[index % len(jobs)]))
+    return pairs[:limit]
+
+
+def bench_normalize_education(resumes, jobs, stages):
+    educations = list(dict.fromkeys(details["education"] for details in resumes + jobs))
+    with stage(stages, "normalize"):
+        for education in educations:
+            normalize_education(education)
+    return len(educations)
+
+
+def bench_compare_education(resumes, jobs, stages):
+    pairs = sample_pairs(resumes, jobs)
+    with stage(stages, "compare"):
+        for resume, job in pairs:
+            _compare_education(resume["education"], job["education"])
+    return len(pairs)
+
+
+def bench_compare_resume_with_job(resumes, jobs, stages):
+    pairs = sample_pairs(resumes, jobs)
+    EDUCATION_MATCH_CACHE.clear()
+    with stage(stages, "compare"):
+        for resume, job in pairs:
+            compare_resume_with_job(resume, job)
+    return len(pairs)
+
+
+def bench_score_matrix(resumes, jobs, stages):
+    """Time the stages of score_matrix separately, then the whole call."""
+    EDUCATION_MATCH_CACHE.clear()
+    with stage(stages, "skills"):
+        resume_matrix, job_matrix, _ = build_skill_matrices(*skill_key_lists(resumes, jobs))
+        (resume_matrix @ job_matrix.T).toarray()
+    with stage(stages, "experience"):
+        build_experience_matrix(
+            [resume["experience_years"] for resume in resumes],
+            [extract_min_experience(job["experience"]) for job in jobs],
+        )
+    with stage(stages, "education"):
+        build_education_matrix([resume["education"] for resume in resumes], [job["education"] for job in jobs])
+
+    EDUCATION_MATCH_CACHE.clear()
+    with stage(stages, "total"):
+        score_matrix(resumes, jobs)
+    return len(resumes) * len(jobs)
+
+
+def bench_detailed_report(resumes, jobs, stages):
+    """
+    Time generate_detailed_compatibility_report on a cold database: rows are
+    inserted without signals, so features and scores are computed on first read.
+    Everything is rolled back afterwards.
+    """
+    from django.db import transaction
+    from ..models import Job, User, UserProfile
+    from ..utils import generate_detailed_compatibility_report
+
+    class Rollback(Exception):
+        pass
+
+    try:
+        with transaction.atomic():
+            with stage(stages, "setup"):
+                users = User.objects.bulk_create(
+                    [User(email=f"bench{i}@example.com") for i in range(len(resumes) + 1)]
+                )
+                employer = users[-1]
+                UserProfile.objects.bulk_create([
+                    UserProfile(
+                        user=user, role='employee', full_name=f"Bench Candidate {i}", contact_number=f"bench{i}",
+                        resume='resumes/bench.pdf', education=resume["education"],
+                        skills=", ".join(resume["skills"]), experience_years=resume["experience_years"],
+                    )
+                    for i, (user, resume) in enumerate(zip(users, resumes))
+                ])
+                Job.objects.bulk_create([
+                    Job(
+                        employer=employer, company_name=f"Bench Co {j}", role="Engineer", job_description="",
+                        education=job["education"], skills=", ".join(job["skills"]), experience=job["experience"],
+                    )
+                    for j, job in enumerate(jobs)
+                ])
+
+            with stage(stages, "cold"):
+                generate_detailed_compatibility_report(employer=employer)
+            with stage(stages, "warm"):
+                report = generate_detailed_compatibility_report(employer=employer)
+            raise Rollback
+    except Rollback:
+        pass
+    return len(report)
+
+
+BENCHMARKS = {
+    "normalize_education": bench_normalize_education,
+    "compare_education": bench_compare_education,
+    "compare_resume_with_job": bench_compare_resume_with_job,
+    "score_matrix": bench_score_matrix,
+    "detailed_report": bench_detailed_report,
+}
+
+# Stage whose time gives the rate; the others are reported for context
+RATE_STAGE = {"score_matrix": "total", "detailed_report": "warm"}
+
+
+def run_benchmark(name, resumes, jobs, measure_memory=True):
+    """
+    Run one benchmark and return its result dict.
+
+    The timed run and the memory run are separate, since tracemalloc slows
+    allocation-heavy code down noticeably.
+    """
+    function = BENCHMARKS[name]
+    gc.collect()
+    stages = {}
+    items = function(resumes, jobs, stages)
+    seconds = stages.get(RATE_STAGE.get(name), sum(stages.values()))
+
+    result = {
+        "name": name,
+        "size": f"{len(resumes)}x{len(jobs)}",
+        "items": items,
+        "seconds": round(seconds, 6),
+        "items_per_second": round(items / seconds, 2) if seconds else None,
+        "stages": {key: round(value, 6) for key, value in stages.items()},
+        "peak_memory_mb": None,
+    }
+
+    if measure_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            function(resumes, jobs, {})
+            result["peak_memory_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_benchmarks(sizes, names=None, seed=0, measure_memory=True):
+    """
+    Run the named benchmarks (all but detailed_report by default) at each
+    (resumes, jobs) size on synthetic data.
+
+    Returns:
+        dict: {"environment": {...}, "results": [result, ...]}, JSON serializable.
+    """
+    names = names or [name for name in BENCHMARKS if name != "detailed_report"]
+    results = []
+    for resume_count, job_count in sizes:
+        resumes = generate_resumes(resume_count, seed=seed)
+        jobs = generate_jobs(job_count, seed=seed + 1)
+        for name in names:
+            results.append(run_benchmark(name, resumes, jobs, measure_memory))
+
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare_to_baseline(report, baseline, tolerance=0.2):
+    """
+    Compare a run against a stored baseline run.
+
+    Returns:
+        list: One message per benchmark whose rate fell more than tolerance
+        (a fraction) below the baseline rate for the same size.
+    """
+    baseline_rates = {
+        (result["name"], result["size"]): result["items_per_second"] for result in baseline.get("results", [])
+    }
+    regressions = []
+    for result in report["results"]:
+        expected = baseline_rates.get((result["name"], result["size"]))
+        if not expected or result["items_per_second"] is None:
+            continue
+        if result["items_per_second"] < expected * (1 - tolerance):
+            regressions.append(
+                f"{result['name']} {result['size']}: {result['items_per_second']:.0f}/s "
+                f"vs baseline {expected:.0f}/s ({result['items_per_second'] / expected - 1:+.0%})"
+            )
+    return regressions
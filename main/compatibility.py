@@ -0,0 +1,458 @@
+import logging
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max, OuterRef, Q, Subquery, Window
+from django.db.models.functions import RowNumber
+
+from .features import get_profile_features, job_details_from_features, resume_details_from_features
+from .models import Job, UserProfile, CompatibilityScore, RecommendationSnapshot
+from .scoring import SCORING_ALGORITHM_VERSION, WEIGHT_EDUCATION, WEIGHT_EXPERIENCE, WEIGHT_SKILLS, skill_key_lists
+from .sharding import score_matrix_sharded
+
+logger = logging.getLogger(__name__)
+
+# Profiles left out of every compatibility report
+EXCLUDED_USERS = ["vinaybharadwaj", "admin"]
+
+SCORE_FIELDS = {
+    "education_compatibility": "education",
+    "skills_compatibility": "skills",
+    "experience_compatibility": "experience",
+    "overall_compatibility": "overall",
+}
+
+
+def is_scored_profile(profile):
+    """Return True if the profile takes part in compatibility reports."""
+    return (
+        profile.role == 'employee'
+        and bool(profile.resume)
+        and profile.full_name.lower() not in EXCLUDED_USERS
+    )
+
+
+def scored_profiles(min_experience=None):
+    """
+    Return every profile that takes part in compatibility reports, with its features.
+
+    Args:
+        min_experience (float): Only return profiles with at least this many
+            years of experience, filtered in the database.
+    """
+    profiles = UserProfile.objects.filter(role='employee', resume__isnull=False).select_related('features')
+    if min_experience is not None:
+        # Profiles never backfilled have no features row to filter on, so they are checked after computing it
+        profiles = profiles.filter(Q(features__experience_years__gte=min_experience) | Q(features__isnull=True))
+    profiles = [profile for profile in profiles if is_scored_profile(profile)]
+    if min_experience is not None:
+        profiles = [profile for profile in profiles if get_profile_features(profile).experience_years >= min_experience]
+    return profiles
+
+
+def compute_scores(jobs, profiles):
+    """
+    Score every (job, profile) pair in one pass and store the results.
+
+    Returns:
+        dict: (job_id, profile_id) -> scores dict keyed like compare_resume_with_job.
+    """
+    if not jobs or not profiles:
+        return {}
+
+    matrix = score_matrix_sharded(
+        [resume_details_from_features(profile) for profile in profiles],
+        [job_details_from_features(job) for job in jobs],
+    )
+
+    scores = {
+        (job.id, profile.id): matrix.scores(i, j)
+        for i, profile in enumerate(profiles)
+        for j, job in enumerate(jobs)
+    }
+    store_scores(scores)
+    return scores
+
+
+def store_scores(scores):
+    """
+    Upsert scores computed elsewhere, given as (job_id, profile_id) -> scores
+    dict keyed like compare_resume_with_job, under the current algorithm version.
+    """
+    CompatibilityScore.objects.bulk_create(
+        [
+            CompatibilityScore(
+                job_id=job_id,
+                profile_id=profile_id,
+                algorithm_version=SCORING_ALGORITHM_VERSION,
+                **{field: pair_scores[key] for key, field in SCORE_FIELDS.items()},
+            )
+            for (job_id, profile_id), pair_scores in scores.items()
+        ],
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['job', 'profile'],
+        update_fields=[*SCORE_FIELDS.values(), 'algorithm_version', 'updated_at'],
+    )
+
+
+def stored_scores(jobs, profiles):
+    """
+    Return the stored scores of the current algorithm version for the given
+    jobs and profiles, without computing anything.
+
+    Returns:
+        dict: (job_id, profile_id) -> scores dict keyed like compare_resume_with_job.
+    """
+    if not jobs or not profiles:
+        return {}
+
+    rows = CompatibilityScore.objects.filter(
+        job__in=[job.id for job in jobs],
+        profile__in=[profile.id for profile in profiles],
+        algorithm_version=SCORING_ALGORITHM_VERSION,
+    ).values_list('job_id', 'profile_id', *SCORE_FIELDS.values())
+    return {
+        (job_id, profile_id): dict(zip(SCORE_FIELDS, values))
+        for job_id, profile_id, *values in rows
+    }
+
+
+def get_scores(jobs, profiles):
+    """
+    Return stored scores for every (job, profile) pair, computing and storing
+    any pair that is missing or was scored by an older algorithm version.
+
+    Returns:
+        dict: (job_id, profile_id) -> scores dict keyed like compare_resume_with_job.
+    """
+    scores = stored_scores(jobs, profiles)
+
+    # Recompute only the jobs and profiles that have a missing pair
+    missing = [(job, profile) for job in jobs for profile in profiles if (job.id, profile.id) not in scores]
+    if missing:
+        stale_jobs = list({job.id: job for job, _ in missing}.values())
+        stale_profiles = list({profile.id: profile for _, profile in missing}.values())
+        logger.info(f"Computing {len(missing)} missing compatibility scores")
+        scores.update(compute_scores(stale_jobs, stale_profiles))
+    return scores
+
+
+def overall_upper_bounds(job, profiles):
+    """
+    Return, per profile, the highest overall score it could reach for the job
+    given its exact skills score and perfect education and experience.
+
+    Only skill sets are compared, so this is far cheaper than scoring. The
+    bound is rounded like score_matrix rounds overall scores, which keeps it
+    an upper bound.
+    """
+    resume_keys, (job_keys,) = skill_key_lists(
+        [resume_details_from_features(profile) for profile in profiles],
+        [job_details_from_features(job)],
+    )
+    job_keys = set(job_keys)
+    bounds = []
+    for keys in resume_keys:
+        skills_score = len(job_keys.intersection(keys)) / len(job_keys) if job_keys else 0.0
+        overall = round(WEIGHT_EDUCATION + skills_score * WEIGHT_SKILLS + WEIGHT_EXPERIENCE, 2)
+        bounds.append(round(overall * 100, 2))
+    return np.array(bounds, dtype=np.float64)
+
+
+# Candidates ranked by the per-job report unless ?top= asks for another count
+REPORT_TOP_K = getattr(settings, 'REPORT_TOP_K', 20)
+
+
+def top_candidates(job, k=REPORT_TOP_K, min_score=None, min_experience=None):
+    """
+    Return the job's k best candidates, best first, as (profile, scores) pairs.
+
+    Stored scores are read first. Their k-th best score and min_score then
+    form a cutoff, and candidates without a stored score are scored only if
+    their skills upper bound reaches it. The k best are picked with
+    numpy.partition, so the cost after scoring is linear in the pool size.
+    Ties keep the scored_profiles order.
+
+    Args:
+        job (Job): Job to rank candidates for.
+        k (int): Number of candidates to return.
+        min_score (float): Leave out candidates whose overall score is below this.
+        min_experience (float): Passed on to scored_profiles.
+    """
+    profiles = scored_profiles(min_experience=min_experience)
+    if k <= 0 or not profiles:
+        return []
+    scores = stored_scores([job], profiles)
+
+    missing = [profile for profile in profiles if (job.id, profile.id) not in scores]
+    if missing:
+        stored_overall = sorted((pair["overall_compatibility"] for pair in scores.values()), reverse=True)
+        cutoff = stored_overall[k - 1] if len(stored_overall) >= k else None
+        if min_score is not None:
+            cutoff = min_score if cutoff is None else max(cutoff, min_score)
+        if cutoff is not None:
+            bounds = overall_upper_bounds(job, missing)
+            missing = [profile for profile, bound in zip(missing, bounds) if bound >= cutoff]
+            logger.debug(f"Skills upper bound left {len(missing)} candidates to score for job {job.id}")
+        scores.update(compute_scores([job], missing))
+
+    candidates = [profile for profile in profiles if (job.id, profile.id) in scores]
+    overall = np.array([scores[(job.id, profile.id)]["overall_compatibility"] for profile in candidates])
+    if min_score is not None:
+        keep = np.flatnonzero(overall >= min_score)
+    else:
+        keep = np.arange(len(candidates))
+
+    if len(keep) > k:
+        # Everything tied with the k-th best survives, so ties are cut in profile order below
+        kth_best = -np.partition(-overall[keep], k - 1)[k - 1]
+        keep = keep[overall[keep] >= kth_best]
+    keep = keep[np.argsort(-overall[keep], kind='stable')][:k]
+    return [(candidates[index], scores[(job.id, candidates[index].id)]) for index in keep.tolist()]
+
+
+def refresh_job_scores(job):
+    """Recompute a job's scores against every scored profile."""
+    compute_scores([job], scored_profiles())
+
+
+def refresh_profile_scores(profile):
+    """Recompute a profile's scores against every job, or drop them if it is no longer scored."""
+    if not is_scored_profile(profile):
+        CompatibilityScore.objects.filter(profile=profile).delete()
+        return
+    compute_scores(list(Job.objects.select_related('features')), [profile])
+
+
+def rebuild_scores(chunk_size=500):
+    """
+    Recompute the whole table, chunk_size jobs at a time, and drop rows for
+    profiles that are no longer scored.
+
+    Returns:
+        int: Number of pairs scored.
+    """
+    profiles = scored_profiles()
+    CompatibilityScore.objects.exclude(profile__in=[profile.id for profile in profiles]).delete()
+    jobs = list(Job.objects.select_related('features'))
+
+    count = 0
+    for start in range(0, len(jobs), chunk_size):
+        count += len(compute_scores(jobs[start:start + chunk_size], profiles))
+
+    rebuild_recommendations()
+
+    from .report_cache import bump_job_set_version
+    bump_job_set_version()
+    return count
+
+
+# Jobs kept per profile in RecommendationSnapshot
+RECOMMENDATION_COUNT = getattr(settings, 'RECOMMENDATION_COUNT', 10)
+
+
+def refresh_recommendations(profile_ids, count=RECOMMENDATION_COUNT):
+    """
+    Replace the recommendation snapshots of the given profiles with their
+    count best stored scores, ranked by overall score and then job id.
+
+    All profiles are ranked by one windowed query over CompatibilityScore.
+
+    Returns:
+        int: Number of snapshot rows written.
+    """
+    profile_ids = list(profile_ids)
+    if not profile_ids:
+        return 0
+
+    ranked = CompatibilityScore.objects.filter(
+        profile__in=profile_ids,
+        algorithm_version=SCORING_ALGORITHM_VERSION,
+    ).annotate(
+        rank=Window(RowNumber(), partition_by=[F('profile_id')], order_by=[F('overall').desc(), F('job_id').asc()]),
+    ).filter(rank__lte=count).values_list('profile_id', 'job_id', 'overall', 'rank')
+    rows = [
+        RecommendationSnapshot(profile_id=profile_id, job_id=job_id, score=score, rank=rank)
+        for profile_id, job_id, score, rank in ranked
+    ]
+
+    with transaction.atomic():
+        RecommendationSnapshot.objects.filter(profile__in=profile_ids).delete()
+        RecommendationSnapshot.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def rebuild_recommendations(chunk_size=500):
+    """
+    Rebuild every snapshot from the stored scores, chunk_size profiles at a
+    time, and drop the snapshots of profiles that are no longer scored.
+
+    Returns:
+        int: Number of snapshot rows written.
+    """
+    profile_ids = [profile.id for profile in scored_profiles()]
+    RecommendationSnapshot.objects.exclude(profile__in=profile_ids).delete()
+    return sum(
+        refresh_recommendations(profile_ids[start:start + chunk_size])
+        for start in range(0, len(profile_ids), chunk_size)
+    )
+
+
+def refresh_job_recommendations(job, count=RECOMMENDATION_COUNT):
+    """
+    Refresh the snapshots a changed job can affect: those already holding it,
+    those not yet full, and those whose last entry it now ties or beats.
+    """
+    floors = dict(RecommendationSnapshot.objects.filter(rank=count).values_list('profile_id', 'score'))
+    affected = set(RecommendationSnapshot.objects.filter(job=job).values_list('profile_id', flat=True))
+    for profile_id, overall in CompatibilityScore.objects.filter(job=job).values_list('profile_id', 'overall'):
+        if profile_id not in floors or overall >= floors[profile_id]:
+            affected.add(profile_id)
+    refresh_recommendations(affected, count)
+
+
+# Upper bound on the (job, profile) pairs iter_scores holds in memory at once
+SCORE_STREAM_CHUNK_PAIRS = getattr(settings, 'SCORE_STREAM_CHUNK_PAIRS', 50_000)
+
+
+def iter_scores(jobs, profiles, chunk_pairs=SCORE_STREAM_CHUNK_PAIRS):
+    """
+    Yield (job, profile, scores) for every pair of jobs x profiles, ordered by
+    job id and then by the order of profiles.
+
+    Jobs are read from the database a chunk at a time, sized so a chunk holds
+    at most chunk_pairs pairs, and each chunk's missing scores are computed
+    and stored before it is yielded. Memory stays bounded by the chunk rather
+    than the whole matrix, and the first pairs are available as soon as the
+    first chunk is scored.
+
+    Args:
+        jobs (QuerySet): Jobs to export.
+        profiles (list): Profiles to export, e.g. from scored_profiles().
+        chunk_pairs (int): Maximum number of pairs per chunk.
+    """
+    if not profiles:
+        return
+    chunk_size = max(1, chunk_pairs // len(profiles))
+    profile_ids = {profile.id for profile in profiles}
+
+    chunk = []
+    for job in jobs.select_related('features').order_by('id').iterator(chunk_size=chunk_size):
+        chunk.append(job)
+        if len(chunk) == chunk_size:
+            yield from _score_chunk(chunk, profiles, profile_ids)
+            chunk = []
+    if chunk:
+        yield from _score_chunk(chunk, profiles, profile_ids)
+
+
+def _score_chunk(jobs, profiles, profile_ids):
+    # Filter on jobs only: the profile list may be far longer than the database accepts as parameters
+    rows = CompatibilityScore.objects.filter(
+        job__in=[job.id for job in jobs],
+        algorithm_version=SCORING_ALGORITHM_VERSION,
+    ).values_list('job_id', 'profile_id', *SCORE_FIELDS.values())
+    scores = {
+        (job_id, profile_id): dict(zip(SCORE_FIELDS, values))
+        for job_id, profile_id, *values in rows.iterator()
+        if profile_id in profile_ids
+    }
+
+    missing = [(job, profile) for job in jobs for profile in profiles if (job.id, profile.id) not in scores]
+    if missing:
+        stale_jobs = list({job.id: job for job, _ in missing}.values())
+        stale_profiles = list({profile.id: profile for _, profile in missing}.values())
+        logger.info(f"Computing {len(missing)} missing compatibility scores for export")
+        scores.update(compute_scores(stale_jobs, stale_profiles))
+
+    for job in jobs:
+        for profile in profiles:
+            yield job, profile, scores[(job.id, profile.id)]
+
+
+# Largest window matrix_window serves, so responses stay the same size however big the grid is
+MATRIX_WINDOW_MAX_ROWS = 100
+MATRIX_WINDOW_MAX_COLUMNS = 50
+
+
+def matrix_window(employer, row_offset=0, row_limit=25, column_offset=0, column_limit=25,
+                  search="", sort="company", descending=False, column_sort="name"):
+    """
+    Return one window of an employer's companies x employees matrix, read
+    from the stored scores.
+
+    Rows are the employer's companies, each scored through its latest job,
+    optionally filtered by a case-insensitive search and sorted by name or
+    by the best score of that job. Columns are the scored employee profiles
+    sorted by name or by their best score on those latest jobs, so both
+    score orders agree with the cells shown. Sorting, counting and slicing
+    happen in the database; only the window's cells are read, and any of
+    those that are missing are computed and stored.
+
+    Args:
+        employer (User): Employer whose jobs form the rows.
+        row_offset, row_limit (int): Window of rows (limit capped at MATRIX_WINDOW_MAX_ROWS).
+        column_offset, column_limit (int): Window of columns (capped at MATRIX_WINDOW_MAX_COLUMNS).
+        search (str): Company name filter.
+        sort (str): "company" or "score" for the rows.
+        descending (bool): Reverse the row order.
+        column_sort (str): "name" or "score" for the columns.
+
+    Returns:
+        dict: JSON-serializable window with totals, "columns" and "rows".
+    """
+    if sort not in ("company", "score") or column_sort not in ("name", "score"):
+        raise ValueError("sort must be 'company' or 'score' and column_sort 'name' or 'score'.")
+    row_limit = max(0, min(row_limit, MATRIX_WINDOW_MAX_ROWS))
+    column_limit = max(0, min(column_limit, MATRIX_WINDOW_MAX_COLUMNS))
+    row_offset, column_offset = max(0, row_offset), max(0, column_offset)
+    current = Q(compatibility_scores__algorithm_version=SCORING_ALGORITHM_VERSION)
+
+    # Rows: one per company name, through its latest job
+    latest_job = Job.objects.filter(employer=employer, company_name=OuterRef('company_name')).order_by('-id')
+    latest_jobs = Job.objects.filter(employer=employer, id=Subquery(latest_job.values('id')[:1]))
+    companies = latest_jobs.filter(company_name__icontains=search) if search else latest_jobs
+    companies = companies.annotate(
+        best=Max('compatibility_scores__overall', filter=current),
+    ).values('company_name', 'best', job_id=F('id'))
+    if sort == "score":
+        companies = companies.order_by(F('best').desc(nulls_last=True) if descending else F('best').asc(nulls_first=True), 'company_name')
+    else:
+        companies = companies.order_by('-company_name' if descending else 'company_name')
+    rows_total = companies.count()
+    rows = list(companies[row_offset:row_offset + row_limit])
+
+    # Columns: the profiles is_scored_profile accepts
+    employees = UserProfile.objects.filter(role='employee', resume__isnull=False).exclude(resume='')
+    for name in EXCLUDED_USERS:
+        employees = employees.exclude(full_name__iexact=name)
+    if column_sort == "score":
+        employees = employees.annotate(
+            best=Max('compatibility_scores__overall', filter=current & Q(compatibility_scores__job__in=latest_jobs.values('id')))
+        ).order_by(F('best').desc(nulls_last=True), 'full_name', 'id')
+    else:
+        employees = employees.order_by('full_name', 'id')
+    columns_total = employees.count()
+    profiles = list(employees.select_related('features')[column_offset:column_offset + column_limit])
+
+    # Cells: stored scores for the window, filling in any missing pairs
+    jobs = list(Job.objects.filter(id__in=[row['job_id'] for row in rows]).select_related('features'))
+    scores = get_scores(jobs, profiles)
+
+    return {
+        "rows_total": rows_total,
+        "columns_total": columns_total,
+        "row_offset": row_offset,
+        "column_offset": column_offset,
+        "columns": [{"user_id": profile.user_id, "full_name": profile.full_name} for profile in profiles],
+        "rows": [
+            {
+                "company": row['company_name'],
+                "job_id": row['job_id'],
+                "scores": [scores[(row['job_id'], profile.id)]["overall_compatibility"] for profile in profiles],
+            }
+            for row in rows
+        ],
+    }
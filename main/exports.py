@@ -0,0 +1,105 @@
+import csv
+import json
+import logging
+
+from django.http import StreamingHttpResponse
+
+from .compatibility import iter_scores
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+EXPORT_FIELDS = [
+    "job_id", "job", "user_id", "candidate",
+    "education_compatibility", "skills_compatibility", "experience_compatibility", "overall_compatibility",
+]
+
+# Rows joined into each chunk handed to the server
+EXPORT_ROWS_PER_CHUNK = 500
+
+
+class _Echo:
+    """File-like object whose write returns the line instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def score_rows(jobs, profiles):
+    """Yield one export row dict per (job, profile) pair, in EXPORT_FIELDS order."""
+    for job, profile, scores in iter_scores(jobs, profiles):
+        yield {
+            "job_id": job.id,
+            "job": f"{job.company_name} - {job.role}",
+            "user_id": profile.user_id,
+            "candidate": profile.full_name,
+            **{key: scores[key] for key in EXPORT_FIELDS[4:]},
+        }
+
+
+def _csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow([row[field] for field in EXPORT_FIELDS])
+
+
+def _ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+def _chunked(lines):
+    # The first line goes out alone so the client gets a response before scoring starts
+    lines = iter(lines)
+    for line in lines:
+        yield line
+        break
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == EXPORT_ROWS_PER_CHUNK:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def _logged(chunks, filename):
+    # Errors after the first byte cannot become an error page, so the download is cut short
+    try:
+        yield from chunks
+    except Exception as e:
+        logger.error(f"Error while streaming {filename}: {e}")
+        raise
+
+
+def stream_scores(jobs, profiles, export_format, filename):
+    """
+    Return a StreamingHttpResponse exporting the scores of jobs x profiles.
+
+    The CSV header goes out before any scoring starts and rows follow chunk
+    by chunk as iter_scores produces them, so memory stays constant however
+    many pairs are exported.
+
+    Args:
+        jobs (QuerySet): Jobs to export.
+        profiles (list): Profiles to export.
+        export_format (str): "csv" or "ndjson".
+        filename (str): Download name without extension.
+    """
+    if export_format not in EXPORT_CONTENT_TYPES:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    lines = _csv_lines if export_format == "csv" else _ndjson_lines
+    filename = f"{filename}.{export_format}"
+    response = StreamingHttpResponse(
+        _logged(_chunked(lines(score_rows(jobs, profiles))), filename),
+        content_type=EXPORT_CONTENT_TYPES[export_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,141 @@
+import logging
+
+from django.db.models import Q
+
+from .models import Job, Skill, JobFeatures, ProfileFeatures
+from .skills import SKILL_VOCABULARY
+from .utils import normalize_education, get_education_level, parse_experience_requirement
+
+logger = logging.getLogger(__name__)
+
+
+def parse_skills(skills_text):
+    """Split a comma separated skills field into stripped, non-empty skill names."""
+    return [skill.strip() for skill in (skills_text or "").split(",") if skill.strip()]
+
+
+def resolve_skill_ids(skill_names):
+    """
+    Return the interned Skill id for each name, adding unknown skills to the vocabulary.
+    """
+    if not skill_names:
+        return []
+    return SKILL_VOCABULARY.ids_for(skill_names)
+
+
+def update_job_features(job):
+    """Parse a job's raw text fields and store them as JobFeatures."""
+    skills = parse_skills(job.skills) or ["Not Specified"]
+    normalized_education = normalize_education(job.education or "Not Specified")
+    levels = [level for level in map(get_education_level, normalized_education) if level > 0]
+    min_experience, max_experience, experience_unit = parse_experience_requirement(job.experience)
+
+    features, _ = JobFeatures.objects.update_or_create(
+        job=job,
+        defaults={
+            "skills": skills,
+            "skill_ids": resolve_skill_ids(skills),
+            "normalized_education": normalized_education,
+            "education_level": min(levels) if levels else 0,
+            "min_experience": min_experience,
+            "max_experience": max_experience,
+            "experience_unit": experience_unit,
+        },
+    )
+    features.indexed_skills.set(set(features.skill_ids))
+    job.features = features  # Replace any stale copy cached on the instance
+    logger.debug(f"Updated features for job {job.id}")
+    return features
+
+
+def update_profile_features(profile):
+    """Parse a profile's raw text fields and store them as ProfileFeatures."""
+    skills = parse_skills(profile.skills) or ["Not Specified"]
+    normalized_education = normalize_education(profile.education or "Not Specified")
+    levels = [get_education_level(education) for education in normalized_education]
+
+    features, _ = ProfileFeatures.objects.update_or_create(
+        profile=profile,
+        defaults={
+            "skills": skills,
+            "skill_ids": resolve_skill_ids(skills),
+            "normalized_education": normalized_education,
+            "education_level": max(levels) if levels else 0,
+            "experience_years": profile.experience_years or 0,
+        },
+    )
+    features.indexed_skills.set(set(features.skill_ids))
+    profile.features = features  # Replace any stale copy cached on the instance
+    logger.debug(f"Updated features for profile {profile.id}")
+    return features
+
+
+def get_job_features(job):
+    """Return the stored features for a job, computing them if it was never backfilled."""
+    try:
+        return job.features
+    except JobFeatures.DoesNotExist:
+        return update_job_features(job)
+
+
+def get_profile_features(profile):
+    """Return the stored features for a profile, computing them if it was never backfilled."""
+    try:
+        return profile.features
+    except ProfileFeatures.DoesNotExist:
+        return update_profile_features(profile)
+
+
+def job_details_from_features(job, features=None):
+    """
+    Build the job_details dict used by the scoring functions from stored features.
+    """
+    features = features or get_job_features(job)
+    return {
+        "education": job.education or "Not Specified",
+        "skills": features.skills,
+        "skill_ids": features.skill_ids,
+        "experience": job.experience or "0",
+        "min_experience": features.min_experience,
+        "normalized_education": features.normalized_education,
+    }
+
+
+def resume_details_from_features(profile, features=None):
+    """
+    Build the resume_details dict used by the scoring functions from stored features.
+    """
+    features = features or get_profile_features(profile)
+    return {
+        "education": profile.education or "Not Specified",
+        "skills": features.skills,
+        "skill_ids": features.skill_ids,
+        "experience_years": features.experience_years,
+        "normalized_education": features.normalized_education,
+    }
+
+
+def synonym_skill_ids(skill_ids):
+    """
+    Return a queryset of the ids of every Skill sharing a synonym group with skill_ids.
+    """
+    group_ids = set(SKILL_VOCABULARY.group_ids(skill_ids))
+    return Skill.objects.filter(Q(id__in=group_ids) | Q(synonym_of__in=group_ids)).values('id')
+
+
+def candidate_job_ids(profile_features):
+    """
+    Return the ids of jobs worth scoring exactly for a profile: jobs sharing at
+    least one skill (or synonym) with it, plus jobs whose education requirement
+    it may meet. Every other job shares no skill and fails the education-level
+    gate, so its skills score is zero.
+    """
+    skill_ids = synonym_skill_ids(profile_features.skill_ids)
+    return set(
+        Job.objects.filter(
+            Q(features__isnull=True) |
+            Q(features__indexed_skills__in=skill_ids) |
+            Q(features__education_level=0) |
+            Q(features__education_level__lte=profile_features.education_level)
+        ).values_list('id', flat=True)
+    )
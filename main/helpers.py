@@ -1,5 +1,7 @@
 import os
 import logging
+import threading
+from collections import OrderedDict
 from docx import Document
 from PyPDF2 import PdfReader
 
@@ -51,3 +53,63 @@ def extract_text_from_txt(file_path):
     except Exception as e:
         logger.error(f"Error reading .txt file {file_path}: {e}")
         return ""
+
+class LRUCache:
+    """
+    Thread-safe bounded LRU cache with hit, miss and eviction counters.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, calling compute() and storing its result on a miss."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        # Compute outside the lock so slow work does not serialize other threads
+        value = compute()
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def resize(self, maxsize):
+        """Change the capacity, evicting least recently used entries if needed."""
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return the current counters as a dict."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
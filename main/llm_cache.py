@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_PATH = getattr(settings, 'LLM_CACHE_PATH', os.path.join(settings.BASE_DIR, 'llm_cache.sqlite3'))
+# Seconds a response stays valid
+LLM_CACHE_TTL = getattr(settings, 'LLM_CACHE_TTL', 7 * 24 * 3600)
+# Total response bytes kept before the least recently used entries are evicted
+LLM_CACHE_MAX_BYTES = getattr(settings, 'LLM_CACHE_MAX_BYTES', 64 * 1024 * 1024)
+
+
+def cache_key(**params):
+    """
+    Content address of a chat completion request: a SHA-256 of its model,
+    messages and every other parameter, independent of keyword order.
+    """
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Persistent SQLite cache of chat completion texts keyed by cache_key.
+
+    Entries expire after ttl seconds, and once the stored responses exceed
+    max_bytes the least recently used ones are evicted. Hit, miss and
+    eviction counters live in the same file, so stats() covers every
+    process sharing it. When disabled, nothing is read or written.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl=LLM_CACHE_TTL, max_bytes=LLM_CACHE_MAX_BYTES, enabled=True):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self):
+        """Yield a connection inside a transaction, committed on success and closed afterwards."""
+        connection = sqlite3.connect(self.path, timeout=10)
+        try:
+            self._initialize(connection)
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _initialize(self, connection):
+        if not self._initialized:
+            with self._lock:
+                connection.executescript("""
+                    PRAGMA journal_mode=WAL;
+                    CREATE TABLE IF NOT EXISTS responses (
+                        key TEXT PRIMARY KEY,
+                        model TEXT NOT NULL,
+                        response TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        created_at REAL NOT NULL,
+                        accessed_at REAL NOT NULL
+                    );
+                    CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+                    CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+                    INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0), ('evictions', 0);
+                """)
+                self._initialized = True
+
+    def _count(self, connection, name, amount=1):
+        connection.execute("UPDATE counters SET value = value + ? WHERE name = ?", (amount, name))
+
+    def get(self, key):
+        """Return the cached response for key, or None if it is missing or expired."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._connect() as connection:
+            row = connection.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self._count(connection, 'misses')
+                return None
+            connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._count(connection, 'hits')
+        return row[0]
+
+    def set(self, key, model, response):
+        """Store a response, then evict least recently used entries beyond max_bytes."""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, len(response.encode()), now, now),
+            )
+            self._evict(connection)
+
+    def _evict(self, connection):
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in connection.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._count(connection, 'evictions', evicted)
+        logger.debug(f"Evicted {evicted} LLM cache entries")
+
+    def purge_expired(self):
+        """Delete every expired entry and return how many were removed."""
+        with self._connect() as connection:
+            return connection.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)).rowcount
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._connect() as connection:
+            connection.execute("DELETE FROM responses")
+            connection.execute("UPDATE counters SET value = 0")
+
+    def stats(self):
+        """Return the counters, entry count and stored bytes as a dict."""
+        with self._connect() as connection:
+            counters = dict(connection.execute("SELECT name, value FROM counters"))
+            entries, size = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+LLM_CACHE = LLMResponseCache(enabled=getattr(settings, 'LLM_CACHE_ENABLED', True))
+
+
+def _cached_response(key):
+    """LLM_CACHE.get, treating a cache that cannot be read as a miss."""
+    try:
+        return LLM_CACHE.get(key)
+    except sqlite3.Error as e:
+        logger.warning(f"LLM cache read failed, calling the API: {e}")
+        return None
+
+
+def _store_response(key, model, response):
+    """LLM_CACHE.set, logging instead of raising when the cache cannot be written."""
+    try:
+        LLM_CACHE.set(key, model, response)
+    except sqlite3.Error as e:
+        logger.warning(f"LLM cache write failed, response not cached: {e}")
+
+
+def chat_completion(client, bypass=False, cacheable=None, **params):
+    """
+    Return the text of client.chat.completions.create(**params), answering
+    repeated requests from LLM_CACHE.
+
+    Args:
+        client (OpenAI): Client to call on a miss.
+        bypass (bool): Skip the cached copy and call the API; the fresh
+            response still replaces it.
+        cacheable (callable): Called with a fresh response, which is only
+            stored if it returns True, e.g. to keep replies that cannot be
+            parsed out of the cache. Every response is stored when omitted.
+
+    A cache that cannot be read or written is logged and skipped, so the
+    request is still answered by the API.
+    """
+    key = cache_key(**params)
+    response = None if bypass else _cached_response(key)
+    if response is None:
+        completion = client.chat.completions.create(**params)
+        response = completion.choices[0].message.content or ""
+        if cacheable is None or cacheable(response):
+            _store_response(key, params.get("model", ""), response)
+    return response
+
+
+async def achat_completion(client, bypass=False, cacheable=None, **params):
+    """
+    chat_completion for an AsyncOpenAI client. The blocking SQLite reads and
+    writes run in worker threads, so concurrent calls keep overlapping on the
+    event loop.
+    """
+    key = cache_key(**params)
+    response = None if bypass else await asyncio.to_thread(_cached_response, key)
+    if response is None:
+        completion = await client.chat.completions.create(**params)
+        response = completion.choices[0].message.content or ""
+        if cacheable is None or cacheable(response):
+            await asyncio.to_thread(_store_response, key, params.get("model", ""), response)
+    return response
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from main.features import update_job_features, update_profile_features
+from main.models import Job, UserProfile
+
+
+class Command(BaseCommand):
+    help = "Compute stored scoring features for every existing job and user profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs-only', action='store_true', help="Only backfill job features.")
+        parser.add_argument('--profiles-only', action='store_true', help="Only backfill profile features.")
+        parser.add_argument('--missing-only', action='store_true', help="Skip rows that already have features.")
+
+    def handle(self, *args, **options):
+        jobs = Job.objects.all()
+        profiles = UserProfile.objects.all()
+        if options['missing_only']:
+            jobs = jobs.filter(features__isnull=True)
+            profiles = profiles.filter(features__isnull=True)
+
+        if not options['profiles_only']:
+            count = 0
+            for job in jobs.iterator():
+                update_job_features(job)
+                count += 1
+            self.stdout.write(self.style.SUCCESS(f"Backfilled features for {count} jobs."))
+
+        if not options['jobs_only']:
+            count = 0
+            for profile in profiles.iterator():
+                update_profile_features(profile)
+                count += 1
+            self.stdout.write(self.style.SUCCESS(f"Backfilled features for {count} profiles."))
@@ -0,0 +1,56 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.benchmarks import BENCHMARKS, compare_to_baseline, run_benchmarks
+
+
+def parse_size(value):
+    try:
+        resumes, jobs = value.lower().split("x")
+        return int(resumes), int(jobs)
+    except ValueError:
+        raise CommandError(f"Invalid size '{value}', expected RESUMESxJOBS such as 1000x1000.")
+
+
+class Command(BaseCommand):
+    help = "Benchmark the compatibility scoring engine on synthetic resumes and jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', default=['1000x1000'], help="RESUMESxJOBS sizes, e.g. 1000x1000 10000x1000.")
+        parser.add_argument('--benchmark', action='append', choices=sorted(BENCHMARKS), dest='benchmarks',
+                            help="Benchmark to run; repeat for several. Defaults to all but detailed_report.")
+        parser.add_argument('--seed', type=int, default=0, help="Seed for the synthetic data generator.")
+        parser.add_argument('--no-memory', action='store_true', help="Skip the peak memory run.")
+        parser.add_argument('--output', help="Write the results as JSON to this file.")
+        parser.add_argument('--baseline', help="Fail if any rate falls below this stored results file.")
+        parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed slowdown against the baseline (fraction).")
+
+    def handle(self, *args, **options):
+        sizes = [parse_size(size) for size in options['sizes']]
+        report = run_benchmarks(sizes, options['benchmarks'], options['seed'], not options['no_memory'])
+
+        for result in report['results']:
+            stages = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in result['stages'].items())
+            memory = f"{result['peak_memory_mb']} MB" if result['peak_memory_mb'] is not None else "n/a"
+            self.stdout.write(
+                f"{result['name']:<26} {result['size']:>11}  {result['items_per_second'] or 0:>12,.0f}/s  "
+                f"peak {memory:>10}  [{stages}]"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as baseline_file:
+                    baseline = json.load(baseline_file)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read baseline {options['baseline']}: {e}")
+
+            regressions = compare_to_baseline(report, baseline, options['tolerance'])
+            if regressions:
+                raise CommandError("Benchmark regressions:\n" + "\n".join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
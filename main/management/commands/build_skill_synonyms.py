@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from main.skills import SKILL_SYNONYM_THRESHOLD, rebuild_synonym_graph
+
+
+class Command(BaseCommand):
+    help = "Recompute the fuzzy synonym groups of every skill, rebuild the skill vocabulary and rescore if any group changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold', type=int, default=SKILL_SYNONYM_THRESHOLD,
+            help="Minimum RapidFuzz ratio (0-100) for two skills to be grouped.",
+        )
+
+    def handle(self, *args, **options):
+        linked = rebuild_synonym_graph(options['threshold'])
+        self.stdout.write(self.style.SUCCESS(f"Linked {linked} skills to a synonym."))
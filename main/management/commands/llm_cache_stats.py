@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from main.llm_cache import LLM_CACHE
+
+
+class Command(BaseCommand):
+    help = "Show the hit rate and size of the LLM response cache, optionally purging or clearing it."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--purge-expired', action='store_true', help="Delete entries older than the TTL first.")
+        parser.add_argument('--clear', action='store_true', help="Delete every entry and reset the counters first.")
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            LLM_CACHE.clear()
+        elif options['purge_expired']:
+            self.stdout.write(f"Purged {LLM_CACHE.purge_expired()} expired entries.")
+
+        stats = LLM_CACHE.stats()
+        self.stdout.write(
+            f"Hits: {stats['hits']}  Misses: {stats['misses']}  Hit rate: {stats['hit_rate']:.2%}\n"
+            f"Entries: {stats['entries']}  Size: {stats['size_bytes']} / {stats['max_bytes']} bytes  "
+            f"Evictions: {stats['evictions']}"
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from main.compatibility import rebuild_scores
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored compatibility score of every job and employee profile pair."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help="Jobs scored per batch.")
+
+    def handle(self, *args, **options):
+        count = rebuild_scores(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Stored {count} compatibility scores."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from main.compatibility import rebuild_recommendations
+
+
+class Command(BaseCommand):
+    help = "Rebuild every employee's top job recommendations from the stored compatibility scores."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help="Profiles ranked per batch.")
+
+    def handle(self, *args, **options):
+        count = rebuild_recommendations(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Stored {count} recommendations."))
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0004_userprofile_expected_salary_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobFeatures',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skills', models.JSONField(default=list)),
+                ('skill_ids', models.JSONField(default=list)),
+                ('normalized_education', models.JSONField(default=list)),
+                ('education_level', models.IntegerField(default=0)),
+                ('min_experience', models.FloatField(default=0)),
+                ('max_experience', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='features', to='main.job')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProfileFeatures',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skills', models.JSONField(default=list)),
+                ('skill_ids', models.JSONField(default=list)),
+                ('normalized_education', models.JSONField(default=list)),
+                ('education_level', models.IntegerField(default=0)),
+                ('experience_years', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='features', to='main.userprofile')),
+            ],
+        ),
+    ]
@@ -0,0 +1,92 @@
+import re
+
+from django.db import migrations
+
+# Frozen copy of main.skills.canonicalize_skill as of this migration
+SKILL_ALIASES = {
+    "js": "javascript",
+    "java script": "javascript",
+    "ts": "typescript",
+    "reactjs": "react",
+    "react.js": "react",
+    "nodejs": "node.js",
+    "node": "node.js",
+    "vuejs": "vue.js",
+    "vue": "vue.js",
+    "angularjs": "angular",
+    "golang": "go",
+    "py": "python",
+    "python3": "python",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "amazon web services": "aws",
+    "gcp": "google cloud",
+    "google cloud platform": "google cloud",
+    "ms excel": "excel",
+    "microsoft excel": "excel",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "nlp": "natural language processing",
+    "ai": "artificial intelligence",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "cpp": "c++",
+    "html5": "html",
+    "css3": "css",
+    "sklearn": "scikit-learn",
+    "scikit learn": "scikit-learn",
+}
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def canonicalize_skill(name):
+    key = WHITESPACE_PATTERN.sub(' ', (name or "").strip()).casefold()
+    return SKILL_ALIASES.get(key, key)
+
+
+def canonicalize_skills(apps, schema_editor):
+    """
+    Rename Skill rows to their canonical form, merge rows that collapse onto the
+    same name (keeping the lowest id) and remap the stored skill_ids.
+    """
+    Skill = apps.get_model('main', 'Skill')
+    JobFeatures = apps.get_model('main', 'JobFeatures')
+    ProfileFeatures = apps.get_model('main', 'ProfileFeatures')
+
+    canonical_ids = {}
+    remap = {}
+    for skill in Skill.objects.order_by('id'):
+        name = canonicalize_skill(skill.name)
+        if name in canonical_ids:
+            remap[skill.id] = canonical_ids[name]
+            continue
+        canonical_ids[name] = skill.id
+
+    Skill.objects.filter(id__in=remap).delete()
+    for skill in Skill.objects.all():
+        name = canonicalize_skill(skill.name)
+        if skill.name != name:
+            skill.name = name
+            skill.save(update_fields=['name'])
+
+    if remap:
+        for model in (JobFeatures, ProfileFeatures):
+            for features in model.objects.all():
+                skill_ids = [remap.get(skill_id, skill_id) for skill_id in features.skill_ids]
+                if skill_ids != features.skill_ids:
+                    features.skill_ids = skill_ids
+                    features.save(update_fields=['skill_ids'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_scoring_features'),
+    ]
+
+    operations = [
+        migrations.RunPython(canonicalize_skills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_canonicalize_skills'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='synonym_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='synonyms', to='main.skill'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:24
+
+from django.db import migrations, models
+
+
+def populate_indexed_skills(apps, schema_editor):
+    """Fill the inverted skill index from the skill_ids already stored on features."""
+    Skill = apps.get_model('main', 'Skill')
+    known_ids = set(Skill.objects.values_list('id', flat=True))
+    for model_name in ('JobFeatures', 'ProfileFeatures'):
+        model = apps.get_model('main', model_name)
+        for features in model.objects.all():
+            features.indexed_skills.set(set(features.skill_ids) & known_ids)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_skill_synonym_of'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobfeatures',
+            name='indexed_skills',
+            field=models.ManyToManyField(blank=True, related_name='indexed_jobs', to='main.skill'),
+        ),
+        migrations.AddField(
+            model_name='profilefeatures',
+            name='indexed_skills',
+            field=models.ManyToManyField(blank=True, related_name='indexed_profiles', to='main.skill'),
+        ),
+        migrations.RunPython(populate_indexed_skills, migrations.RunPython.noop),
+    ]
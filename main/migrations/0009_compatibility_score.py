@@ -0,0 +1,32 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_features_indexed_skills'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompatibilityScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('education', models.FloatField(default=0)),
+                ('skills', models.FloatField(default=0)),
+                ('experience', models.FloatField(default=0)),
+                ('overall', models.FloatField(default=0)),
+                ('algorithm_version', models.PositiveSmallIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='compatibility_scores', to='main.job')),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='compatibility_scores', to='main.userprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['profile', '-overall'], name='main_compat_profile_665c4b_idx'), models.Index(fields=['job', '-overall'], name='main_compat_job_id_00738b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('job', 'profile'), name='unique_compatibility_score')],
+            },
+        ),
+    ]
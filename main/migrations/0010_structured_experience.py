@@ -0,0 +1,74 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:30
+
+import re
+
+from django.db import migrations, models
+
+# Frozen copy of main.utils.parse_experience_requirement as of this migration
+EXPERIENCE_RANGE_PATTERN = re.compile(r'(\d+)(?:\s*-|\s+to\s+)(\d+)')
+EXPERIENCE_YEARS_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(?:years?|yrs?)')
+EXPERIENCE_MIN_PATTERN = re.compile(r'(?:minimum|min|at least)\s*(\d+(?:\.\d+)?)')
+EXPERIENCE_MONTHS_PATTERN = re.compile(r'\b(?:months?|mos?)\b')
+
+
+def parse_experience_requirement(experience_text):
+    """Return (minimum, maximum, unit) for a job's raw experience field."""
+    if not experience_text:
+        return 0, None, "years"
+
+    text = experience_text.lower()
+    unit = "months" if EXPERIENCE_MONTHS_PATTERN.search(text) else "years"
+
+    range_match = EXPERIENCE_RANGE_PATTERN.search(text)
+    if range_match:
+        return float(range_match.group(1)), float(range_match.group(2)), unit
+
+    for pattern in (EXPERIENCE_YEARS_PATTERN, EXPERIENCE_MIN_PATTERN):
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1)), None, unit
+
+    return 0, None, unit
+
+
+def backfill_experience(apps, schema_editor):
+    """Re-parse every job's experience field into min, max and unit."""
+    JobFeatures = apps.get_model('main', 'JobFeatures')
+    changed = []
+    for features in JobFeatures.objects.select_related('job'):
+        features.min_experience, features.max_experience, features.experience_unit = (
+            parse_experience_requirement(features.job.experience)
+        )
+        changed.append(features)
+    JobFeatures.objects.bulk_update(changed, ['min_experience', 'max_experience', 'experience_unit'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_compatibility_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobfeatures',
+            name='experience_unit',
+            field=models.CharField(default='years', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='jobfeatures',
+            name='max_experience',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='jobfeatures',
+            name='min_experience',
+            field=models.FloatField(db_index=True, default=0),
+        ),
+        migrations.AlterField(
+            model_name='profilefeatures',
+            name='experience_years',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(backfill_experience, migrations.RunPython.noop),
+    ]
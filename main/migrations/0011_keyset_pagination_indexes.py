@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_structured_experience'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['-created_at', '-id'], name='main_job_created_e59460_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['employer', '-created_at', '-id'], name='main_job_employe_965b5c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['-applied_on', '-id'], name='main_jobapp_applied_2d95b9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['job', '-applied_on', '-id'], name='main_jobapp_job_id_ae96db_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendation_snapshots', to='main.job')),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='main.userprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('profile', 'rank'), name='unique_recommendation_rank'), models.UniqueConstraint(fields=('profile', 'job'), name='unique_recommendation_job')],
+            },
+        ),
+    ]
@@ -152,6 +152,13 @@ class Job(models.Model):
     location = models.CharField(max_length=255)
     created_at = models.DateTimeField(default=now, editable=False)
 
+    class Meta:
+        # Keyset pagination seeks on (created_at, id), overall and per employer
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['employer', '-created_at', '-id']),
+        ]
+
     def __str__(self):
         return f"{self.company_name} - {self.role}"
 
@@ -163,6 +170,13 @@ class JobApplication(models.Model):
     resume = models.FileField(upload_to=upload_to_resumes, blank=True, null=True)
     applied_on = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Keyset pagination seeks on (applied_on, id), overall and per job
+        indexes = [
+            models.Index(fields=['-applied_on', '-id']),
+            models.Index(fields=['job', '-applied_on', '-id']),
+        ]
+
     def save(self, *args, **kwargs):
         """Ensure resume is assigned if not uploaded."""
         if not self.resume and self.user.userprofile.resume:
@@ -171,3 +185,89 @@ class JobApplication(models.Model):
 
     def __str__(self):
         return f"{self.user.email} - {self.job.role}"
+
+
+# Canonical skill vocabulary shared by job and profile features
+class Skill(models.Model):
+    name = models.CharField(max_length=255, unique=True)
+    # Representative skill of this skill's near-duplicate group, None if it is the representative
+    synonym_of = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='synonyms')
+
+    def __str__(self):
+        return self.name
+
+
+# Scoring features parsed from a Job whenever it is saved
+class JobFeatures(models.Model):
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, related_name='features')
+    skills = models.JSONField(default=list)  # Stripped skill names, in posting order
+    skill_ids = models.JSONField(default=list)  # Skill ids matching skills
+    # Inverted skill -> job index, kept in sync with skill_ids
+    indexed_skills = models.ManyToManyField(Skill, blank=True, related_name='indexed_jobs')
+    normalized_education = models.JSONField(default=list)
+    education_level = models.IntegerField(default=0)  # Lowest degree level the job accepts
+    min_experience = models.FloatField(default=0, db_index=True)
+    max_experience = models.FloatField(blank=True, null=True, db_index=True)
+    experience_unit = models.CharField(max_length=10, default='years')  # Unit the requirement was stated in
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Features for {self.job}"
+
+
+# Scoring features parsed from a UserProfile whenever it is saved
+class ProfileFeatures(models.Model):
+    profile = models.OneToOneField(UserProfile, on_delete=models.CASCADE, related_name='features')
+    skills = models.JSONField(default=list)
+    skill_ids = models.JSONField(default=list)
+    # Inverted skill -> profile index, kept in sync with skill_ids
+    indexed_skills = models.ManyToManyField(Skill, blank=True, related_name='indexed_profiles')
+    normalized_education = models.JSONField(default=list)
+    education_level = models.IntegerField(default=0)  # Highest degree level held
+    experience_years = models.IntegerField(default=0, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Features for {self.profile}"
+
+
+# Stored compatibility scores for one (job, profile) pair, kept fresh by signals
+class CompatibilityScore(models.Model):
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='compatibility_scores')
+    profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='compatibility_scores')
+    education = models.FloatField(default=0)  # Percentages, as returned by compare_resume_with_job
+    skills = models.FloatField(default=0)
+    experience = models.FloatField(default=0)
+    overall = models.FloatField(default=0)
+    algorithm_version = models.PositiveSmallIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'profile'], name='unique_compatibility_score'),
+        ]
+        indexes = [
+            models.Index(fields=['profile', '-overall']),
+            models.Index(fields=['job', '-overall']),
+        ]
+
+    def __str__(self):
+        return f"{self.profile} - {self.job}: {self.overall}%"
+
+
+# Materialized top-N jobs per employee profile, ranked from CompatibilityScore
+class RecommendationSnapshot(models.Model):
+    profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='recommendations')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='recommendation_snapshots')
+    rank = models.PositiveSmallIntegerField()  # 1 is the best match
+    score = models.FloatField(default=0)  # Overall compatibility percentage
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'rank'], name='unique_recommendation_rank'),
+            models.UniqueConstraint(fields=['profile', 'job'], name='unique_recommendation_job'),
+        ]
+
+    def __str__(self):
+        return f"{self.profile} #{self.rank}: {self.job}"
@@ -0,0 +1,122 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from django.http import JsonResponse
+
+
+class KeysetPage:
+    """
+    One page of a keyset-paginated listing, newest first.
+
+    Iterates like a list of the page's objects. next_cursor and
+    previous_cursor are opaque strings for the ?after= and ?before= query
+    parameters, or None at either end of the listing.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+def encode_cursor(obj, field):
+    """Return the cursor pointing at obj in a listing ordered by (field, id)."""
+    value = [getattr(obj, field).isoformat(), obj.pk]
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Return the (timestamp, id) a cursor points at.
+
+    Raises:
+        ValueError: If the cursor was not produced by encode_cursor.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(timestamp), int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid page cursor.") from e
+
+
+def keyset_page(queryset, field, after=None, before=None, per_page=10):
+    """
+    Return one page of queryset ordered newest first by (field, id).
+
+    Each page is a range query that seeks to the cursor through an index on
+    (field, id) instead of counting and skipping rows with OFFSET, so a deep
+    page costs the same as the first one. There are no page numbers or
+    totals, which would need a count over the whole listing.
+
+    Args:
+        queryset (QuerySet): Listing to paginate; its ordering is replaced.
+        field (str): Timestamp field the listing is ordered by, e.g. "created_at".
+        after (str): Cursor of the last row of the previous page; returns the rows after it.
+        before (str): Cursor of the first row of the next page; returns the rows before it.
+        per_page (int): Rows per page.
+
+    Raises:
+        ValueError: If a cursor is invalid.
+    """
+    if before:
+        timestamp, pk = decode_cursor(before)
+        rows = list(
+            queryset.filter(Q(**{f"{field}__gt": timestamp}) | Q(**{field: timestamp, "pk__gt": pk}))
+            .order_by(field, "pk")[:per_page + 1]
+        )
+        has_more = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor(rows[-1], field) if rows else None,
+            previous_cursor=encode_cursor(rows[0], field) if has_more else None,
+        )
+
+    if after:
+        timestamp, pk = decode_cursor(after)
+        queryset = queryset.filter(Q(**{f"{field}__lt": timestamp}) | Q(**{field: timestamp, "pk__lt": pk}))
+    rows = list(queryset.order_by(f"-{field}", "-pk")[:per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1], field) if has_more else None,
+        previous_cursor=encode_cursor(rows[0], field) if after and rows else None,
+    )
+
+
+def request_page(request, queryset, field, per_page=10):
+    """keyset_page for the request's ?after= or ?before= cursor."""
+    return keyset_page(
+        queryset, field, after=request.GET.get('after'), before=request.GET.get('before'), per_page=per_page,
+    )
+
+
+def page_json(page, serialize):
+    """JSON for infinite scroll: the page's rows plus the cursors to fetch its neighbours."""
+    return JsonResponse({
+        "results": [serialize(obj) for obj in page],
+        "next_cursor": page.next_cursor,
+        "previous_cursor": page.previous_cursor,
+    })
@@ -0,0 +1,124 @@
+import hashlib
+import logging
+import uuid
+
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+
+from .scoring import SCORING_ALGORITHM_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Cache alias holding generated reports and their version tokens
+REPORT_CACHE_ALIAS = getattr(settings, 'REPORT_CACHE_ALIAS', 'reports')
+
+JOB_SET_VERSION_KEY = "report:version:jobs"
+
+
+def get_report_cache():
+    try:
+        return caches[REPORT_CACHE_ALIAS]
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def profile_version_key(profile_id):
+    return f"report:version:profile:{profile_id}"
+
+
+def _current_version(cache, key):
+    """
+    Return the version token stored under key, creating one if it is missing.
+
+    Tokens are random rather than counters, so a token evicted from the
+    cache can never be recreated with a value that matches old entries.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_job_set_version():
+    """Invalidate every cached report; called whenever any job changes."""
+    get_report_cache().set(JOB_SET_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def bump_profile_version(profile_id):
+    """Invalidate the cached reports of one profile; called whenever it changes."""
+    get_report_cache().set(profile_version_key(profile_id), uuid.uuid4().hex, timeout=None)
+
+
+def employee_report_key(profile_id, options):
+    """Cache key combining the profile and job-set versions with the report options."""
+    cache = get_report_cache()
+    options_digest = hashlib.md5(repr(sorted(options.items())).encode()).hexdigest()[:12]
+    return (
+        f"report:employee:{profile_id}:v{SCORING_ALGORITHM_VERSION}:"
+        f"{_current_version(cache, profile_version_key(profile_id))}:"
+        f"{_current_version(cache, JOB_SET_VERSION_KEY)}:{options_digest}"
+    )
+
+
+def cached_employee_compatibility_report(employee, **options):
+    """
+    Return generate_employee_compatibility_report(employee, **options),
+    reusing a cached copy until the employee's profile or any job changes.
+    """
+    from .utils import generate_employee_compatibility_report
+
+    profile_id = getattr(getattr(employee, 'userprofile', None), 'id', None)
+    if profile_id is None:
+        return generate_employee_compatibility_report(employee, **options)
+
+    cache = get_report_cache()
+    key = employee_report_key(profile_id, options)
+    report = cache.get(key)
+    if report is None:
+        report = generate_employee_compatibility_report(employee, **options)
+        cache.set(key, report)
+    else:
+        logger.debug(f"Employee report cache hit for profile {profile_id}")
+    return report
+
+
+def formatted_profile_key(profile_id):
+    return f"profile:formatted:{profile_id}"
+
+
+def clear_formatted_profile(profile_id):
+    """Drop a profile's cached formatted fields; called whenever it changes."""
+    get_report_cache().delete(formatted_profile_key(profile_id))
+
+
+def attach_formatted_fields(profiles):
+    """
+    Set formatted_education, formatted_links and formatted_experience_projects
+    on each profile, parsing only the profiles missing from the cache.
+
+    Args:
+        profiles (iterable): UserProfile instances, e.g. one page of results.
+    """
+    from .utils import format_education, format_experience_projects, format_links
+
+    profiles = list(profiles)
+    cache = get_report_cache()
+    cached = cache.get_many([formatted_profile_key(profile.id) for profile in profiles])
+
+    missing = {}
+    for profile in profiles:
+        key = formatted_profile_key(profile.id)
+        fields = cached.get(key)
+        if fields is None:
+            fields = missing[key] = {
+                "formatted_education": format_education(profile.education),
+                "formatted_links": format_links(profile.links),
+                "formatted_experience_projects": format_experience_projects(profile.experience_projects),
+            }
+        for name, value in fields.items():
+            setattr(profile, name, value)
+
+    if missing:
+        cache.set_many(missing)
+    return profiles
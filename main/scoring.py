@@ -0,0 +1,252 @@
+import logging
+
+import numpy as np
+from scipy import sparse
+
+from .utils import compare_education, extract_min_experience, skill_key_list
+
+logger = logging.getLogger(__name__)
+
+# Stored CompatibilityScore rows from another version are recomputed; bump when scoring rules change
+SCORING_ALGORITHM_VERSION = 1
+
+# Same weights as calculate_overall_score
+WEIGHT_EDUCATION = 0.3
+WEIGHT_SKILLS = 0.4
+WEIGHT_EXPERIENCE = 0.3
+
+
+def _round_array(values, ndigits=2):
+    """
+    Round every element with Python's round() so results are bit-identical to
+    the scalar scoring path (numpy.round uses a different rounding strategy).
+    """
+    flat = [round(value, ndigits) for value in values.ravel().tolist()]
+    return np.array(flat, dtype=np.float64).reshape(values.shape)
+
+
+def build_skill_matrices(resume_skill_lists, job_skill_lists):
+    """
+    Build binary CSR skill-incidence matrices over a shared vocabulary.
+
+    Args:
+        resume_skill_lists (list): One list of skill keys (ids or names) per resume.
+        job_skill_lists (list): One list of skill keys (ids or names) per job.
+
+    Returns:
+        tuple: (resume_matrix, job_matrix, vocabulary) where both matrices have
+        one row per entry and one column per vocabulary skill.
+    """
+    vocabulary = {}
+
+    def to_csr(skill_lists):
+        indptr = [0]
+        indices = []
+        for skills in skill_lists:
+            # Set semantics, exactly like skill_match_keys in compare_resume_with_job
+            columns = {vocabulary.setdefault(skill, len(vocabulary)) for skill in skills}
+            indices.extend(sorted(columns))
+            indptr.append(len(indices))
+        return indptr, indices
+
+    resume_indptr, resume_indices = to_csr(resume_skill_lists)
+    job_indptr, job_indices = to_csr(job_skill_lists)
+
+    shape_cols = max(len(vocabulary), 1)
+    resume_matrix = sparse.csr_matrix(
+        (np.ones(len(resume_indices), dtype=np.int32), resume_indices, resume_indptr),
+        shape=(len(resume_skill_lists), shape_cols),
+    )
+    job_matrix = sparse.csr_matrix(
+        (np.ones(len(job_indices), dtype=np.int32), job_indices, job_indptr),
+        shape=(len(job_skill_lists), shape_cols),
+    )
+    return resume_matrix, job_matrix, vocabulary
+
+
+def skill_key_lists(resume_details_list, job_details_list):
+    """
+    Return per-entry skill keys for both sides: synonym group ids when every
+    entry carries interned skill ids, otherwise canonical skill names.
+    """
+    use_ids = all(details.get("skill_ids") is not None for details in resume_details_list + job_details_list)
+    return (
+        [skill_key_list(details, use_ids) for details in resume_details_list],
+        [skill_key_list(details, use_ids) for details in job_details_list],
+    )
+
+
+def _encode(values):
+    """Map each value to a small integer code, returning (codes, unique_values)."""
+    index = {}
+    codes = np.fromiter((index.setdefault(value, len(index)) for value in values), dtype=np.int64, count=len(values))
+    return codes, list(index)
+
+
+def build_education_matrix(resume_educations, job_educations):
+    """
+    Compute compare_education for every (resume, job) pair, calling it only once
+    per distinct pair of education strings.
+
+    Returns:
+        tuple: (education_matrix, error_matrix). error_matrix flags pairs whose
+        comparison raised, which the scalar path reports as all-zero scores.
+    """
+    resume_codes, resume_unique = _encode(resume_educations)
+    job_codes, job_unique = _encode(job_educations)
+
+    table = np.zeros((len(resume_unique), len(job_unique)), dtype=np.float64)
+    errors = np.zeros(table.shape, dtype=bool)
+    for r, resume_education in enumerate(resume_unique):
+        for j, job_education in enumerate(job_unique):
+            try:
+                table[r, j] = compare_education(resume_education, job_education)
+            except Exception as e:
+                logger.error(f"Error comparing education '{resume_education}' with '{job_education}': {e}")
+                errors[r, j] = True
+
+    return table[np.ix_(resume_codes, job_codes)], errors[np.ix_(resume_codes, job_codes)]
+
+
+def build_experience_matrix(resume_years, job_min_years):
+    """
+    Vectorized version of the experience rule in compare_resume_with_job.
+    """
+    years = np.asarray(resume_years, dtype=np.float64)[:, np.newaxis]
+    required = np.asarray(job_min_years, dtype=np.float64)[np.newaxis, :]
+
+    ratio = np.divide(years, required, out=np.zeros(np.broadcast(years, required).shape), where=required != 0) * 1.0
+    partial = np.where((years > 0) & (years < required), ratio, 0.0)
+    return np.where(years >= required, 1.0, partial)
+
+
+class ScoreMatrix:
+    """
+    Compatibility scores for every (resume, job) pair.
+
+    education, skills, experience and overall are (len(resumes), len(jobs))
+    float arrays holding the same rounded percentages that
+    compare_resume_with_job returns for that pair. education_match and
+    experience_match keep the unrounded 0-1 values used for the Yes/No
+    thresholds of the criteria matrix.
+    """
+
+    def __init__(self, education, skills, experience, overall,
+                 education_match=None, experience_match=None, job_min_years=None):
+        self.education = education
+        self.skills = skills
+        self.experience = experience
+        self.overall = overall
+        self.education_match = education_match
+        self.experience_match = experience_match
+        self.job_min_years = job_min_years
+
+    @property
+    def shape(self):
+        return self.overall.shape
+
+    def scores(self, resume_index, job_index):
+        """Return the scores dict for one pair, keyed like compare_resume_with_job."""
+        return {
+            "education_compatibility": float(self.education[resume_index, job_index]),
+            "skills_compatibility": float(self.skills[resume_index, job_index]),
+            "experience_compatibility": float(self.experience[resume_index, job_index]),
+            "overall_compatibility": float(self.overall[resume_index, job_index]),
+        }
+
+
+def score_matrix(resume_details_list, job_details_list, skill_keys=None):
+    """
+    Score every resume against every job in one pass.
+
+    Args:
+        resume_details_list (list): Dicts with "education", "skills" and "experience_years".
+        job_details_list (list): Dicts with "education", "skills" and "experience",
+            plus an optional pre-parsed "min_experience".
+        skill_keys (tuple): Optional (resume_keys, job_keys) from skill_key_lists,
+            used instead of the details' "skills" when given.
+
+    Returns:
+        ScoreMatrix: Scores matching compare_resume_with_job for each pair.
+    """
+    shape = (len(resume_details_list), len(job_details_list))
+    if not shape[0] or not shape[1]:
+        empty = np.zeros(shape, dtype=np.float64)
+        return ScoreMatrix(empty, empty.copy(), empty.copy(), empty.copy())
+
+    # Skills: matched counts for all pairs come from one sparse product
+    resume_matrix, job_matrix, _ = build_skill_matrices(
+        *(skill_keys or skill_key_lists(resume_details_list, job_details_list))
+    )
+    matched = (resume_matrix @ job_matrix.T).toarray().astype(np.float64)
+    required = np.diff(job_matrix.indptr).astype(np.float64)[np.newaxis, :]
+    skills_score = np.divide(matched, required, out=np.zeros(shape), where=required != 0)
+
+    # Experience
+    job_min_years = [
+        job["min_experience"] if job.get("min_experience") is not None else extract_min_experience(job["experience"])
+        for job in job_details_list
+    ]
+    experience_match = build_experience_matrix(
+        [resume["experience_years"] for resume in resume_details_list],
+        job_min_years,
+    )
+
+    # Education
+    education_match, errors = build_education_matrix(
+        [resume["education"] for resume in resume_details_list],
+        [job["education"] for job in job_details_list],
+    )
+
+    overall_score = _round_array(
+        (education_match * WEIGHT_EDUCATION) +
+        (skills_score * WEIGHT_SKILLS) +
+        (experience_match * WEIGHT_EXPERIENCE)
+    )
+
+    matrix = ScoreMatrix(
+        _round_array(education_match * 100),
+        _round_array(skills_score * 100),
+        _round_array(experience_match * 100),
+        _round_array(overall_score * 100),
+        education_match=education_match,
+        experience_match=experience_match,
+        job_min_years=job_min_years,
+    )
+
+    # Pairs whose education comparison failed score zero, like the scalar path
+    if errors.any():
+        for array in (matrix.education, matrix.skills, matrix.experience, matrix.overall):
+            array[errors] = 0.0
+
+    return matrix
+
+
+def top_n_indices(scores, top_n):
+    """
+    Return the column indices of each row's top_n scores, best first.
+
+    One numpy.argpartition over the whole matrix picks every row's top_n in
+    linear time; only those top_n are then sorted. Ties go to the lower
+    column index, like ORDER BY score DESC, id when columns are in id order.
+
+    Args:
+        scores (ndarray): (rows, columns) percentages rounded to 2 decimals,
+            e.g. ScoreMatrix.overall.
+        top_n (int): Columns to keep per row; fewer if there are fewer columns.
+
+    Returns:
+        ndarray: (rows, min(top_n, columns)) int array of column indices.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    rows, columns = scores.shape
+    top_n = min(top_n, columns)
+    if top_n <= 0:
+        return np.zeros((rows, 0), dtype=np.int64)
+
+    # Scores are multiples of 0.01, so a penalty totalling under 0.001 per row
+    # breaks ties by column without reordering distinct scores
+    keys = scores - np.arange(columns) * (0.001 / columns)
+    top = np.argpartition(-keys, top_n - 1, axis=1)[:, :top_n]
+    order = np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
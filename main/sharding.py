@@ -0,0 +1,114 @@
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Worker processes used for sharded scoring; 1 disables the pool
+SCORING_POOL_SIZE = getattr(settings, 'SCORING_POOL_SIZE', os.cpu_count() or 1)
+# Reports with fewer (resume, job) pairs than this are scored in-process
+SCORING_SHARD_THRESHOLD = getattr(settings, 'SCORING_SHARD_THRESHOLD', 250_000)
+SHARDS_PER_WORKER = 4
+
+
+def _init_worker():
+    """Make sure Django is set up in workers started with spawn or forkserver."""
+    import django
+    django.setup()
+
+
+def extract_features(resume_details_list, job_details_list):
+    """
+    Reduce the details dicts to picklable tuples that workers can score
+    without touching the ORM or the skill vocabulary.
+
+    Returns:
+        tuple: (resume_features, job_features) where each resume is
+        (education, skill_keys, experience_years) and each job is
+        (education, skill_keys, min_experience).
+    """
+    from .scoring import skill_key_lists
+    from .utils import extract_min_experience
+
+    resume_keys, job_keys = skill_key_lists(resume_details_list, job_details_list)
+    resume_features = [
+        (details["education"], tuple(keys), details["experience_years"])
+        for details, keys in zip(resume_details_list, resume_keys)
+    ]
+    job_features = [
+        (
+            details["education"],
+            tuple(keys),
+            details["min_experience"] if details.get("min_experience") is not None
+            else extract_min_experience(details["experience"]),
+        )
+        for details, keys in zip(job_details_list, job_keys)
+    ]
+    return resume_features, job_features
+
+
+def score_shard(resume_offset, job_offset, resume_features, job_features):
+    """
+    Score one block of the matrix in a worker process.
+
+    Returns:
+        tuple: (resume_offset, job_offset, education, skills, experience, overall)
+        with the rounded percentage arrays of the block.
+    """
+    from .scoring import score_matrix
+
+    matrix = score_matrix(
+        [{"education": education, "experience_years": years} for education, _, years in resume_features],
+        [{"education": education, "min_experience": years} for education, _, years in job_features],
+        skill_keys=([keys for _, keys, _ in resume_features], [keys for _, keys, _ in job_features]),
+    )
+    return resume_offset, job_offset, matrix.education, matrix.skills, matrix.experience, matrix.overall
+
+
+def _shard_bounds(size, shards):
+    step = max(1, math.ceil(size / shards))
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+
+def score_matrix_sharded(resume_details_list, job_details_list, pool_size=None, threshold=None):
+    """
+    Score every resume against every job, splitting large matrices into
+    blocks scored by a ProcessPoolExecutor.
+
+    Small inputs, or a pool size of 1, fall back to score_matrix. The sharded
+    result carries the rounded percentages only; use score_matrix when the
+    unrounded matches are needed for the criteria matrix.
+
+    Returns:
+        ScoreMatrix: Scores matching compare_resume_with_job for each pair.
+    """
+    from .scoring import ScoreMatrix, score_matrix
+
+    pool_size = pool_size or SCORING_POOL_SIZE
+    threshold = SCORING_SHARD_THRESHOLD if threshold is None else threshold
+    shape = (len(resume_details_list), len(job_details_list))
+    if pool_size <= 1 or shape[0] * shape[1] < threshold or not shape[0] or not shape[1]:
+        return score_matrix(resume_details_list, job_details_list)
+
+    resume_features, job_features = extract_features(resume_details_list, job_details_list)
+
+    # Split the longer side into a few shards per worker so uneven shards still balance
+    shards = pool_size * SHARDS_PER_WORKER
+    if shape[1] >= shape[0]:
+        blocks = [(0, start, resume_features, job_features[start:end]) for start, end in _shard_bounds(shape[1], shards)]
+    else:
+        blocks = [(start, 0, resume_features[start:end], job_features) for start, end in _shard_bounds(shape[0], shards)]
+
+    arrays = [np.zeros(shape, dtype=np.float64) for _ in range(4)]
+    with ProcessPoolExecutor(max_workers=pool_size, initializer=_init_worker) as executor:
+        for r_start, j_start, *block_arrays in executor.map(score_shard, *zip(*blocks)):
+            rows, columns = block_arrays[0].shape
+            for array, block in zip(arrays, block_arrays):
+                array[r_start:r_start + rows, j_start:j_start + columns] = block
+
+    logger.info(f"Scored {shape[0]}x{shape[1]} matrix in {len(blocks)} shards on {pool_size} workers")
+    return ScoreMatrix(*arrays)
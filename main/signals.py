@@ -1,7 +1,12 @@
 from django.conf import settings
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver  
-from .models import Job, UserProfile, User
+from .models import Job, UserProfile, User, RecommendationSnapshot
+from .features import update_job_features, update_profile_features
+from .compatibility import (
+    refresh_job_recommendations, refresh_job_scores, refresh_profile_scores, refresh_recommendations,
+)
+from .report_cache import bump_job_set_version, bump_profile_version, clear_formatted_profile
 import os
 
 @receiver(post_save, sender=Job)
@@ -14,3 +19,56 @@ def clear_cache(sender, instance, **kwargs):
         for file in os.listdir(cache_dir):
             os.remove(os.path.join(cache_dir, file))
 
+
+@receiver(post_save, sender=Job)
+def refresh_job_features(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_job_features(instance)
+
+
+@receiver(post_save, sender=UserProfile)
+def refresh_profile_features(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_profile_features(instance)
+
+
+# Registered after the feature receivers, so scores are computed from fresh features
+@receiver(post_save, sender=Job)
+def refresh_job_compatibility(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_job_scores(instance)
+        refresh_job_recommendations(instance)
+
+
+@receiver(post_save, sender=UserProfile)
+def refresh_profile_compatibility(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_profile_scores(instance)
+        refresh_recommendations([instance.id])
+
+
+# A deleted job's snapshot rows cascade away, so note their profiles first and re-rank them after
+@receiver(pre_delete, sender=Job)
+def collect_job_recommendations(sender, instance, **kwargs):
+    instance._recommendation_profile_ids = list(
+        RecommendationSnapshot.objects.filter(job=instance).values_list('profile_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Job)
+def refresh_deleted_job_recommendations(sender, instance, **kwargs):
+    refresh_recommendations(getattr(instance, '_recommendation_profile_ids', []))
+
+
+# Cached reports are keyed on these versions, so bumping them invalidates the reports
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_reports(sender, instance, **kwargs):
+    bump_job_set_version()
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_profile_reports(sender, instance, **kwargs):
+    bump_profile_version(instance.id)
+    clear_formatted_profile(instance.id)
@@ -0,0 +1,284 @@
+import logging
+import os
+import re
+import threading
+
+import marisa_trie
+import numpy as np
+from django.conf import settings
+from rapidfuzz import fuzz, process
+
+from .models import Skill
+
+logger = logging.getLogger(__name__)
+
+# Common alternative spellings mapped to the canonical skill name
+SKILL_ALIASES = {
+    "js": "javascript",
+    "java script": "javascript",
+    "ts": "typescript",
+    "reactjs": "react",
+    "react.js": "react",
+    "nodejs": "node.js",
+    "node": "node.js",
+    "vuejs": "vue.js",
+    "vue": "vue.js",
+    "angularjs": "angular",
+    "golang": "go",
+    "py": "python",
+    "python3": "python",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "amazon web services": "aws",
+    "gcp": "google cloud",
+    "google cloud platform": "google cloud",
+    "ms excel": "excel",
+    "microsoft excel": "excel",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "nlp": "natural language processing",
+    "ai": "artificial intelligence",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "cpp": "c++",
+    "html5": "html",
+    "css3": "css",
+    "sklearn": "scikit-learn",
+    "scikit learn": "scikit-learn",
+}
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+SKILL_VOCABULARY_PATH = getattr(
+    settings, 'SKILL_VOCABULARY_PATH',
+    os.path.join(settings.BASE_DIR, 'main', 'cache', 'skill_vocabulary_groups.marisa')
+)
+
+# Minimum RapidFuzz ratio (0-100) for two skill names to be treated as synonyms
+SKILL_SYNONYM_THRESHOLD = getattr(settings, 'SKILL_SYNONYM_THRESHOLD', 90)
+# Rows scored per cdist call, bounding the score matrix to chunk x vocabulary bytes
+SKILL_SYNONYM_CHUNK_SIZE = getattr(settings, 'SKILL_SYNONYM_CHUNK_SIZE', 2048)
+
+
+def canonicalize_skill(name):
+    """
+    Return the canonical form of a skill name: case-folded, whitespace collapsed
+    and aliases resolved, so "Python", "python " and "py" all become "python".
+    """
+    key = WHITESPACE_PATTERN.sub(' ', (name or "").strip()).casefold()
+    return SKILL_ALIASES.get(key, key)
+
+
+def find_synonym_pairs(queries, choices, threshold=SKILL_SYNONYM_THRESHOLD, chunk_size=SKILL_SYNONYM_CHUNK_SIZE):
+    """
+    Score every query against every choice with RapidFuzz and return the
+    (query_index, choice_index) pairs at or above threshold.
+
+    Uses process.cdist, which scores a whole block of queries in one
+    multi-threaded call; queries are chunked so memory stays bounded.
+    """
+    pairs = []
+    if not queries or not choices:
+        return pairs
+
+    for start in range(0, len(queries), chunk_size):
+        scores = process.cdist(
+            queries[start:start + chunk_size], choices,
+            scorer=fuzz.ratio, score_cutoff=threshold, dtype=np.uint8, workers=-1,
+        )
+        rows, columns = np.nonzero(scores)
+        pairs.extend(zip((rows + start).tolist(), columns.tolist()))
+    return pairs
+
+
+def build_synonym_groups(names, threshold=SKILL_SYNONYM_THRESHOLD):
+    """
+    Group near-duplicate skill names.
+
+    Args:
+        names (list): Canonical skill names.
+        threshold (int): Minimum fuzz.ratio score for two names to be linked.
+
+    Returns:
+        list: For each name, the index of its group's representative, which is
+        the earliest name in the group.
+    """
+    parent = list(range(len(names)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in find_synonym_pairs(names, names, threshold):
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    return [find(i) for i in range(len(names))]
+
+
+def rebuild_synonym_graph(threshold=SKILL_SYNONYM_THRESHOLD):
+    """
+    Recompute the synonym group of every Skill and persist it as Skill.synonym_of.
+
+    Scores match skills by group, so when any group changes the stored
+    compatibility scores and the recommendation snapshots ranked from them
+    are rebuilt with rebuild_scores.
+
+    Returns:
+        int: Number of skills linked to another skill.
+    """
+    skills = list(Skill.objects.order_by('id'))
+    groups = build_synonym_groups([skill.name for skill in skills], threshold)
+
+    changed = []
+    for skill, group in zip(skills, groups):
+        synonym_of_id = skills[group].id if skills[group] is not skill else None
+        if skill.synonym_of_id != synonym_of_id:
+            skill.synonym_of_id = synonym_of_id
+            changed.append(skill)
+    Skill.objects.bulk_update(changed, ['synonym_of'], batch_size=500)
+
+    SKILL_VOCABULARY.rebuild()
+
+    # Skill matches changed, so every stored score and the snapshots and cached reports built on them are stale
+    if changed:
+        from .compatibility import rebuild_scores
+        rebuild_scores()
+
+    linked = sum(1 for skill, group in zip(skills, groups) if skills[group] is not skill)
+    logger.info(f"Skill synonym graph rebuilt: {linked} of {len(skills)} skills linked")
+    return linked
+
+
+class SkillVocabulary:
+    """
+    Process-wide skill name -> (Skill id, synonym group id) lookup backed by a
+    marisa-trie file.
+
+    The trie is rebuilt from the Skill table whenever new skills are added and
+    written atomically to SKILL_VOCABULARY_PATH, so every worker process
+    memory-maps the same compact file and reloads it when it changes. The
+    group id is the id of the skill's synonym_of representative, so matching
+    on group ids counts near-duplicate spellings as the same skill.
+    """
+
+    def __init__(self, path=SKILL_VOCABULARY_PATH):
+        self.path = path
+        self._trie = None
+        self._groups = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _current_trie(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            self.rebuild()
+            mtime = os.stat(self.path).st_mtime_ns
+
+        if self._trie is None or mtime != self._mtime:
+            with self._lock:
+                trie = marisa_trie.RecordTrie('<QQ')
+                trie.mmap(self.path)
+                self._groups = dict(value for _, value in trie.items())
+                self._trie, self._mtime = trie, mtime
+        return self._trie
+
+    def rebuild(self):
+        """Rebuild the trie file from the Skill table and known aliases."""
+        values = {
+            name: (skill_id, synonym_of_id or skill_id)
+            for name, skill_id, synonym_of_id in Skill.objects.values_list('name', 'id', 'synonym_of_id')
+        }
+        records = list(values.items())
+        records.extend(
+            (alias, values[canonical]) for alias, canonical in SKILL_ALIASES.items() if canonical in values
+        )
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        marisa_trie.RecordTrie('<QQ', records).save(temp_path)
+        os.replace(temp_path, self.path)
+        logger.info(f"Skill vocabulary rebuilt with {len(values)} skills")
+
+    def get(self, name):
+        """Return the Skill id for a skill name or alias, or None if unknown."""
+        matches = self._current_trie().get(canonicalize_skill(name))
+        return matches[0][0] if matches else None
+
+    def group_ids(self, skill_ids):
+        """Map Skill ids to their synonym group ids; unknown ids map to themselves."""
+        self._current_trie()
+        groups = self._groups
+        return [groups.get(skill_id, skill_id) for skill_id in skill_ids]
+
+    def prefix_search(self, prefix):
+        """Return (name, skill_id) pairs for every known skill starting with prefix."""
+        return [(name, value[0]) for name, value in self._current_trie().items(canonicalize_skill(prefix))]
+
+    def ids_for(self, skill_names):
+        """
+        Return the Skill id for each name, adding unknown skills to the vocabulary.
+        """
+        canonical_names = [canonicalize_skill(name) for name in skill_names]
+        # Ids written to the database always come from the Skill table itself
+        ids = dict(Skill.objects.filter(name__in=set(canonical_names)).values_list('name', 'id'))
+
+        missing = set(canonical_names) - ids.keys()
+        if missing:
+            Skill.objects.bulk_create([Skill(name=name) for name in missing], ignore_conflicts=True)
+            new_skills = list(Skill.objects.filter(name__in=missing))
+            ids.update((skill.name, skill.id) for skill in new_skills)
+            self._link_synonyms(new_skills)
+            self.rebuild()
+        else:
+            # A trie file left over from another database (e.g. after a restore) is rebuilt
+            trie = self._current_trie()
+            if any(trie.get(name, [(None,)])[0][0] != skill_id for name, skill_id in ids.items()):
+                self.rebuild()
+
+        return [ids[name] for name in canonical_names]
+
+    def _link_synonyms(self, new_skills):
+        """
+        Merge newly added skills into the synonym groups, scoring them against
+        the whole vocabulary, themselves included, in one cdist call.
+
+        The union-find of build_synonym_groups is seeded with the stored
+        groups, so a new skill matching several groups joins them under the
+        earliest representative, just as a full rebuild_synonym_graph would.
+        """
+        new_ids = {skill.id for skill in new_skills}
+        skills = [
+            (name, skill_id, synonym_of_id)
+            for name, skill_id, synonym_of_id in Skill.objects.order_by('id').values_list('name', 'id', 'synonym_of_id')
+            if skill_id not in new_ids
+        ]
+        skills.extend((skill.name, skill.id, None) for skill in new_skills)
+        parent = {skill_id: synonym_of_id or skill_id for _, skill_id, synonym_of_id in skills}
+
+        def find(skill_id):
+            while parent[skill_id] != skill_id:
+                parent[skill_id] = parent[parent[skill_id]]
+                skill_id = parent[skill_id]
+            return skill_id
+
+        for new_index, index in find_synonym_pairs([skill.name for skill in new_skills], [name for name, _, _ in skills]):
+            root_new, root = find(new_skills[new_index].id), find(skills[index][1])
+            if root_new != root:
+                parent[max(root_new, root)] = min(root_new, root)
+
+        linked = []
+        for _, skill_id, synonym_of_id in skills:
+            root = find(skill_id)
+            group_id = root if root != skill_id else None
+            if group_id != synonym_of_id:
+                linked.append(Skill(id=skill_id, synonym_of_id=group_id))
+        Skill.objects.bulk_update(linked, ['synonym_of'])
+
+SKILL_VOCABULARY = SkillVocabulary()
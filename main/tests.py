@@ -1,3 +1,804 @@
-from django.test import TestCase
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from . import llm_cache, utils
+from .ai_scoring import score_pairs
+from .compatibility import (
+    compute_scores, get_scores, rebuild_recommendations, scored_profiles, stored_scores, top_candidates,
+)
+from .exports import EXPORT_FIELDS
+from .features import candidate_job_ids
+from .helpers import LRUCache
+from .llm_cache import LLMResponseCache, cache_key
+from .models import CompatibilityScore, Job, JobFeatures, ProfileFeatures, Skill, User, UserProfile
+from .report_cache import cached_employee_compatibility_report, get_report_cache
+from .scoring import SCORING_ALGORITHM_VERSION, score_matrix, top_n_indices
+from .sharding import score_matrix_sharded
+from .skills import SKILL_VOCABULARY, build_synonym_groups, canonicalize_skill, rebuild_synonym_graph
+from .utils import (
+    EducationIndex, compare_education, compare_resume_with_job, score_resume_against_job, create_education_lookup_table,
+    format_education, generate_employee_compatibility_report, get_education_cache_stats, normalize_education,
+    parse_experience_requirement,
+)
+from .views import REPORT_TABLE_HEADINGS, is_json_reply, is_report_table
+
+
+SAMPLE_EDUCATIONS = [
+    "B.Tech/B.E., MTech in Computers",
+    "Bachelor of Science in Computer Science; Master of Science in Software Engineering",
+    "Any Graduate",
+    "MBA",
+    "PhD in Physics",
+    "Diploma",
+    "Not Specified",
+    "",
+]
+SAMPLE_SKILLS = ["Python", "Django", "SQL", "AWS", "Java", "React", "Docker", "Excel", "", "Not Specified"]
+
+# Outputs of the original linear-scan normalize_education, pinned so the
+# prebuilt index keeps returning exactly the same normalizations.
+EDUCATION_GOLDEN_CORPUS = [
+    ('B.Tech/B.E., MTech in Computers', ['Bachelor of Technology', 'Bachelor of Engineering', 'Master of Technology in computers']),
+    ('Bachelor of Science in Computer Science; Master of Science in Software Engineering', ['Bachelor of Science in computer science', 'Master of Science in software engineering']),
+    ('B.E.', ['Bachelor of Engineering']),
+    ('b.tech.', ['Bachelor of Technology']),
+    ('BTech in Mechanical Engineering', ['Bachelor of Technology in mechanical engineering']),
+    ('M.Tech with specialization in VLSI', ['Master of Technology in vlsi']),
+    ('MBA', ['Master of Business Administration']),
+    ('Post Graduate Diploma in Management', ['Diploma in management']),
+    ('PhD in Physics', ['Doctor of Philosophy in physics']),
+    ('Ph.D', ['Doctor of Philosophy']),
+    ('Doctorate', ['Doctoral Degree']),
+    ('Any Graduate', ['Any Graduate']),
+    ('Any Postgraduate', ['Any Postgraduate']),
+    ('12th', ['Higher Secondary']),
+    ('10th, 12th', ['Secondary School', 'Higher Secondary']),
+    ('HSC', ['Higher Secondary Certificate']),
+    ('Diploma in Civil Engineering', ['Diploma in civil engineering']),
+    ('CA', ['Chartered Accountant']),
+    ('Chartered Accountant', ['Chartered Accountant']),
+    ('ICWA', ['Cost and Management Accountant']),
+    ('B.Com', ['Bachelor of Commerce']),
+    ('Bachelor of Commerce (Honours)', ['Bachelor of Commerce in commerce (honours)']),
+    ('BSc Computer Science', ['Bachelor of Science']),
+    ('M.Sc. Mathematics', ['Master of Science']),
+    ('BCA/MCA', ['Bachelor of Computer Applications', 'Master of Computer Applications']),
+    ('B.A. in Economics', ['Bachelor of Arts in economics']),
+    ('Master of Business Administration with focus on Marketing', ['Master of Business Administration in business administration with focus on marketing']),
+    ('Graduate from IIT Delhi', ['Graduate from IIT Delhi']),
+    ('Engineering degree', ['Engineering degree']),
+    ('B.Pharma', ['B.Pharma']),
+    ('Not Specified', ['Not Specified']),
+    ('', []),
+    ('Some College', ['Some College']),
+    ("[{'degree': 'Bachelor of Technology', 'institution': 'XYZ', 'year': '2019'}]", ["Bachelor of Technology in technology'", "'institution': 'XYZ'", "'year': '2019'}]"]),
+    ('LLB; LLM', ['LLB', 'LLM']),
+    ('MBBS, MD', ['Bachelor of Medicine and Bachelor of Surgery', 'Doctor of Medicine']),
+    ('B.Arch', ['Bachelor of Arts']),
+    ('M.E. specializing in Thermal Engineering', ['Master of Engineering in thermal engineering']),
+]
+
+SAMPLE_EXPERIENCE = ["2-5 years", "0", "3 years", "minimum 4", "1 to 3 yrs", "7 Yrs", ""]
+
+
+class ScoreMatrixTests(SimpleTestCase):
+    def test_matches_compare_resume_with_job(self):
+        rng = random.Random(7)
+        resumes = [
+            {
+                "education": rng.choice(SAMPLE_EDUCATIONS) or "Not Specified",
+                "skills": rng.sample(SAMPLE_SKILLS, rng.randint(1, 5)),
+                "experience_years": rng.randint(0, 8),
+            }
+            for _ in range(12)
+        ]
+        jobs = [
+            {
+                "education": rng.choice(SAMPLE_EDUCATIONS) or "Not Specified",
+                "skills": rng.sample(SAMPLE_SKILLS, rng.randint(1, 6)),
+                "experience": rng.choice(SAMPLE_EXPERIENCE) or "0",
+            }
+            for _ in range(9)
+        ]
+
+        matrix = score_matrix(resumes, jobs)
+
+        for i, resume in enumerate(resumes):
+            for j, job in enumerate(jobs):
+                _, expected = compare_resume_with_job(resume, job)
+                expected.pop("recommendation")
+                self.assertEqual(matrix.scores(i, j), expected)
+                self.assertEqual(score_resume_against_job(resume, job), expected)
+
+    def test_empty_inputs(self):
+        self.assertEqual(score_matrix([], []).shape, (0, 0))
+
+    def test_sharded_matches_single_process(self):
+        rng = random.Random(11)
+        resumes = [
+            {"education": rng.choice(SAMPLE_EDUCATIONS) or "Not Specified", "skills": rng.sample(SAMPLE_SKILLS, 3), "experience_years": rng.randint(0, 8)}
+            for _ in range(7)
+        ]
+        jobs = [
+            {"education": rng.choice(SAMPLE_EDUCATIONS) or "Not Specified", "skills": rng.sample(SAMPLE_SKILLS, 4), "experience": rng.choice(SAMPLE_EXPERIENCE) or "0"}
+            for _ in range(10)
+        ]
+
+        expected = score_matrix(resumes, jobs)
+        sharded = score_matrix_sharded(resumes, jobs, pool_size=2, threshold=0)
+
+        for name in ("education", "skills", "experience", "overall"):
+            self.assertEqual(getattr(sharded, name).tolist(), getattr(expected, name).tolist())
+
+    def test_top_n_indices_match_stable_sort(self):
+        rng = random.Random(5)
+        # Few distinct values, so many ties fall on the top-n boundary
+        scores = [[rng.choice([0.0, 32.5, 62.0, 94.0, 100.0]) for _ in range(40)] for _ in range(6)]
+        for top_n in (1, 7, 40, 50):
+            expected = [
+                sorted(range(len(row)), key=lambda column: (-row[column], column))[:top_n] for row in scores
+            ]
+            self.assertEqual(top_n_indices(scores, top_n).tolist(), expected)
+
+
+class NormalizeEducationTests(SimpleTestCase):
+    def test_golden_corpus(self):
+        for education_text, expected in EDUCATION_GOLDEN_CORPUS:
+            with self.subTest(education_text=education_text):
+                self.assertEqual(normalize_education(education_text), expected)
+
+    def test_custom_lookup_table(self):
+        lookup_table = create_education_lookup_table()
+        lookup_table["pgdm"] = "Post Graduate Diploma in Management"
+        self.assertEqual(normalize_education("PGDM", lookup_table), ["Post Graduate Diploma in Management"])
+        self.assertEqual(normalize_education("PGDM"), ["PGDM"])
+
+    def test_index_prefers_earliest_table_entry(self):
+        index = EducationIndex({"b.e.": "First", "be": "Second", "engineering": "Third"})
+        self.assertEqual(index.match_abbreviation("be"), "First")
+        self.assertEqual(index.match_key("engineering be"), "Second")
+        self.assertEqual(index.match_full_form("first and third"), "First")
+
+
+class CanonicalizeSkillTests(SimpleTestCase):
+    def test_case_whitespace_and_aliases(self):
+        self.assertEqual(canonicalize_skill("  Machine   Learning "), "machine learning")
+        self.assertEqual(canonicalize_skill("ReactJS"), "react")
+        self.assertEqual(canonicalize_skill("py"), "python")
+
+    def test_variants_count_as_one_skill(self):
+        resume = {"education": "B.Tech", "skills": ["python", "JS"], "experience_years": 2}
+        job = {"education": "B.Tech", "skills": ["Python", "JavaScript", "Python "], "experience": "2 years"}
+        self.assertEqual(score_resume_against_job(resume, job)["skills_compatibility"], 100.0)
+
+
+class SkillSynonymGroupTests(TestCase):
+    def setUp(self):
+        vocabulary_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(vocabulary_dir.cleanup)
+        patcher = mock.patch.object(SKILL_VOCABULARY, 'path', os.path.join(vocabulary_dir.name, 'skills.marisa'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_synonym_groups(self):
+        names = ["postgresql", "java", "postgre sql", "javascript", "postgresql db"]
+        self.assertEqual(build_synonym_groups(names, threshold=90), [0, 1, 0, 3, 4])
+
+    def test_new_skills_are_linked_like_a_full_rebuild(self):
+        SKILL_VOCABULARY.ids_for(["micro service", "python"])
+        SKILL_VOCABULARY.ids_for(["micro-services"])  # Too far from "micro service" to link on its own
+        # "micro services" is close to both existing groups; "terraforms" only to another new skill
+        SKILL_VOCABULARY.ids_for(["micro services", "terraform", "terraforms"])
+        incremental = dict(Skill.objects.values_list('name', 'synonym_of__name'))
+
+        rebuild_synonym_graph()
+        self.assertEqual(dict(Skill.objects.values_list('name', 'synonym_of__name')), incremental)
+        groups = {name: synonym_of or name for name, synonym_of in incremental.items()}
+        self.assertEqual(groups["micro-services"], "micro service")
+        self.assertEqual(groups["micro services"], "micro service")
+        # Which new skill of a batch gets the lower id is up to the database
+        self.assertEqual(groups["terraform"], groups["terraforms"])
+        self.assertEqual(groups["python"], "python")
+
+
+class ParseExperienceRequirementTests(SimpleTestCase):
+    def test_parses_min_max_and_unit(self):
+        cases = [
+            ("2-5 years", (2.0, 5.0, "years")),
+            ("1 to 3 yrs", (1.0, 3.0, "years")),
+            ("7 Yrs", (7.0, None, "years")),
+            ("minimum 4", (4.0, None, "years")),
+            ("6-12 months", (6.0, 12.0, "months")),
+            ("", (0, None, "years")),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(parse_experience_requirement(text), expected)
+
+
+class LRUCacheTests(SimpleTestCase):
+    def test_counts_hits_misses_and_evictions(self):
+        cache = LRUCache(maxsize=2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("b", lambda: 2)
+        self.assertEqual(cache.get_or_compute("a", lambda: 0), 1)
+        cache.get_or_compute("c", lambda: 3)  # Evicts "b", the least recently used
+
+        self.assertEqual(cache.get_or_compute("b", lambda: 4), 4)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (1, 4, 2))
+        self.assertEqual(stats["size"], 2)
+
+    def test_compare_education_is_memoized(self):
+        with mock.patch.object(utils, 'EDUCATION_MATCH_CACHE', LRUCache(maxsize=2)):
+            first = compare_education("B.Tech in Computers", "Any Graduate")
+            self.assertEqual(compare_education("B.Tech in Computers", "Any Graduate"), first)
+            compare_education("MBA", "B.Tech/B.E.")
+            compare_education("PhD in Physics", "MBA")  # Evicts the first pair
+            compare_education("B.Tech in Computers", "Any Graduate")
+            stats = get_education_cache_stats()
+
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (1, 4, 2))
+        self.assertEqual(stats["size"], 2)
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """
+    Chat completions endpoint that replies after a delay: "slow" prompts take
+    2s, "vague" prompts get a reply without a number, the rest score 87.
+    """
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt = body["messages"][-1]["content"]
+        server = self.server
+        with server.lock:
+            server.calls += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(2 if "slow" in prompt else 0.2)
+        with server.lock:
+            server.in_flight -= 1
+
+        content = "It depends." if "vague" in prompt else "87"
+        payload = json.dumps({
+            "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        }).encode()
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client gave up on a timed-out call
+
+    def log_message(self, format, *args):
+        pass
+
+
+class AIScoringTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeOpenAIHandler)
+        self.server.lock = threading.Lock()
+        self.server.calls = self.server.in_flight = self.server.max_in_flight = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.llm_cache = LLMResponseCache(path=os.path.join(cache_dir.name, 'llm.sqlite3'))
+        patcher = mock.patch.object(llm_cache, 'LLM_CACHE', self.llm_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        overrides = self.settings(
+            OPENAI_API_KEY='test-key',
+            OPENAI_BASE_URL=f'http://127.0.0.1:{self.server.server_port}/v1',
+            OPENAI_MAX_RETRIES=0,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_grid_runs_concurrently_with_partial_results(self):
+        pairs = {(job, employee): (f"job {job}", f"skills {employee}") for job in range(3) for employee in range(4)}
+        pairs["duplicate"] = ("job 0", "skills 0")
+        pairs["slow"] = ("slow job", "Python")
+        pairs["vague"] = ("vague job", "Python")
+
+        started = time.monotonic()
+        scores = score_pairs(pairs, concurrency=6, timeout=1)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual({scores[key] for key in pairs if key not in ("slow", "vague")}, {87.0})
+        self.assertTrue(scores["slow"].startswith("Error: Timed out"))
+        self.assertEqual(scores["vague"], "Error: No valid score found in the API response.")
+        # 14 distinct prompts: the duplicate shares a call, and at most 6 run at once
+        self.assertEqual(self.server.calls, 14)
+        self.assertEqual(self.server.max_in_flight, 6)
+        self.assertLess(elapsed, 14 * 0.2)
+
+    def test_deadline_keeps_finished_scores(self):
+        scores = score_pairs({"fast": ("job", "Python"), "slow": ("slow job", "Python")}, timeout=5, deadline=1)
+        self.assertEqual(scores["fast"], 87.0)
+        self.assertTrue(scores["slow"].startswith("Error: Timed out"))
+
+    def test_repeated_grid_is_served_from_cache(self):
+        pairs = {job: (f"job {job}", "Python") for job in range(4)}
+        self.assertEqual(set(score_pairs(pairs).values()), {87.0})
+        self.assertEqual(self.server.calls, 4)
+
+        started = time.monotonic()
+        self.assertEqual(set(score_pairs(pairs).values()), {87.0})
+        self.assertLess(time.monotonic() - started, 0.2)
+        self.assertEqual(self.server.calls, 4)
+        self.assertEqual(score_pairs(pairs, bypass=True), score_pairs(pairs))
+        self.assertEqual(self.server.calls, 8)
+
+        stats = self.llm_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (8, 4, 4))
+        self.assertEqual(stats["hit_rate"], 0.6667)
+
+    def test_replies_without_a_score_are_not_cached(self):
+        pairs = {"vague": ("vague job", "Python"), "clear": ("job", "Python")}
+        score_pairs(pairs)
+        self.assertEqual(score_pairs(pairs)["vague"], "Error: No valid score found in the API response.")
+        self.assertEqual(self.server.calls, 3)
+        self.assertEqual(self.llm_cache.stats()["entries"], 1)
+
+    def test_cache_lookups_do_not_block_the_event_loop(self):
+        slow_get = lambda key: time.sleep(0.5)
+        pairs = {job: (f"job {job}", "Python") for job in range(6)}
+        started = time.monotonic()
+        with mock.patch.object(self.llm_cache, 'get', side_effect=slow_get):
+            self.assertEqual(set(score_pairs(pairs).values()), {87.0})
+        # Six blocking lookups in a row would take 3s
+        self.assertLess(time.monotonic() - started, 1.5)
+
+    def test_unusable_cache_falls_back_to_the_api(self):
+        unwritable = LLMResponseCache(path=os.path.join(tempfile.gettempdir(), 'missing-dir', 'sub', 'llm.sqlite3'))
+        client = mock.Mock()
+        client.chat.completions.create.return_value.choices = [mock.Mock(message=mock.Mock(content="42"))]
+        with mock.patch.object(llm_cache, 'LLM_CACHE', unwritable), self.assertLogs('main.llm_cache', 'WARNING') as logs:
+            self.assertEqual(score_pairs({"job": ("job", "Python")}), {"job": 87.0})
+            self.assertEqual(llm_cache.chat_completion(client, model="gpt-4", messages=[]), "42")
+        self.assertEqual(self.server.calls, 1)
+        self.assertEqual(len(logs.records), 4)  # A failed read and write for each call
+
+
+class LLMResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.path = os.path.join(cache_dir.name, 'llm.sqlite3')
+
+    def test_key_covers_model_messages_and_parameters(self):
+        messages = [{"role": "user", "content": "hi"}]
+        key = cache_key(model="gpt-4", messages=messages, temperature=0.2)
+        self.assertEqual(key, cache_key(temperature=0.2, messages=messages, model="gpt-4"))
+        self.assertNotEqual(key, cache_key(model="gpt-4", messages=messages, temperature=0.3))
+        self.assertNotEqual(key, cache_key(model="gpt-3.5-turbo", messages=messages, temperature=0.2))
+
+    def test_ttl_and_size_eviction(self):
+        cache = LLMResponseCache(path=self.path, ttl=60, max_bytes=10)
+        cache.set("a", "gpt-4", "12345")
+        cache.set("b", "gpt-4", "12345")
+        self.assertEqual(cache.get("a"), "12345")  # "b" is now the least recently used
+        cache.set("c", "gpt-4", "12345")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+        with mock.patch('main.llm_cache.time.time', return_value=time.time() + 61):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["entries"], 1)
+
+    def test_view_reply_checks(self):
+        self.assertTrue(is_json_reply('```json\n{"name": "Asha"}\n```'))
+        self.assertFalse(is_json_reply('Sorry, I cannot parse this resume.'))
+        self.assertFalse(is_json_reply('["Asha"]'))
+
+        table = "<table><tbody>" + "".join(f"<tr><th>{heading}</th><td>-</td></tr>" for heading in REPORT_TABLE_HEADINGS)
+        self.assertTrue(is_report_table(table + "</tbody></table>"))
+        self.assertFalse(is_report_table(table))  # Cut off by max_tokens
+        self.assertFalse(is_report_table("<p>The candidate is a good fit.</p>"))
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = LLMResponseCache(path=self.path, enabled=False)
+        cache.set("a", "gpt-4", "reply")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+
+class EmployeeViewQueryCountTests(TestCase):
+    """The score and recommendation views must not run a query per job."""
+
+    def setUp(self):
+        # Keep the test database's skill vocabulary out of the project cache directory
+        vocabulary_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(vocabulary_dir.cleanup)
+        patcher = mock.patch.object(SKILL_VOCABULARY, 'path', os.path.join(vocabulary_dir.name, 'skills.marisa'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Cached reports and formatted profiles are keyed by ids the database reuses between tests
+        self.addCleanup(get_report_cache().clear)
+
+        self.employer = User.objects.create_user(email='employer@example.com', password='secret')
+        UserProfile.objects.create(user=self.employer, role='employer', full_name='Employer', contact_number='100', company_name='Acme')
+        self.employee = User.objects.create_user(email='employee@example.com', password='secret')
+        UserProfile.objects.create(
+            user=self.employee, role='employee', full_name='Asha', contact_number='200', resume='resumes/asha.pdf',
+            education='B.Tech', skills='Python, SQL', experience_years=3,
+        )
+        self.client.force_login(self.employee)
+
+    def add_job(self, **fields):
+        index = Job.objects.count()
+        return Job.objects.create(**{
+            'employer': self.employer, 'company_name': f'Company {index}', 'job_description': '-', 'role': 'Developer',
+            'industry_type': 'IT', 'department': 'Engineering', 'employment_type': 'Full Time', 'role_category': 'Dev',
+            'education': 'B.Tech', 'skills': 'Python, Docker', 'experience': '2-4 years', 'location': 'Pune',
+            **fields,
+        })
+
+    def add_jobs(self, count):
+        for _ in range(count):
+            self.add_job()
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_jobs(self):
+        self.add_jobs(2)
+        scores_queries = self.count_queries('/view-compatibility-scores/')
+        recommendations_queries = self.count_queries('/view-recommendations/')
+
+        self.add_jobs(8)
+        self.assertEqual(self.count_queries('/view-compatibility-scores/'), scores_queries)
+        self.assertEqual(self.count_queries('/view-recommendations/'), recommendations_queries)
+
+    def test_single_job_report_scores_one_pair(self):
+        self.add_jobs(2)
+        job = Job.objects.order_by('id').first()
+        url = f'/job-compatibility/{job.id}/'
+        queries = self.count_queries(url)
+
+        self.add_jobs(8)
+        self.assertEqual(self.count_queries(url), queries)
+        response = self.client.get(url)
+        self.assertEqual(response.context["company_name"], job.company_name)
+        self.assertEqual(response.context["overall_compatibility"]["skills_compatibility"], 50.0)
+
+    def test_legacy_job_name_report_scores_one_pair(self):
+        self.add_jobs(2)
+        job = Job.objects.order_by('id').first()
+        url = '/compatibility-report/Company-0/'
+        queries = self.count_queries(url)
+        self.assertEqual(queries, self.count_queries(f'/job-compatibility/{job.id}/'))
+
+        self.add_jobs(8)
+        self.assertEqual(self.count_queries(url), queries)
+        response = self.client.get(url)
+        self.assertEqual(response.context["company_name"], job.company_name)
+        self.assertEqual(response.context["overall_compatibility"]["skills_compatibility"], 50.0)
+
+    def test_company_with_several_jobs_lists_each_job(self):
+        developer = self.add_job(company_name='Acme')
+        analyst = self.add_job(company_name='Acme', role='Analyst', skills='Python, SQL')
+
+        response = self.client.get('/view-compatibility-scores/')
+        self.assertEqual(list(response.context['compatibility_scores']), [analyst.id, developer.id])
+
+        # The old name-based link no longer picks one of them arbitrarily
+        response = self.client.get('/compatibility-report/acme/')
+        self.assertTemplateUsed(response, 'main/view_compatibility_scores.html')
+        self.assertEqual(list(response.context['compatibility_scores']), [developer.id, analyst.id])
+        self.assertContains(response, f'/job-compatibility/{analyst.id}/')
+
+    def test_report_cache_reuses_and_invalidates(self):
+        self.add_jobs(2)
+        report = cached_employee_compatibility_report(self.employee)
+        with self.assertNumQueries(0):
+            self.assertEqual(cached_employee_compatibility_report(self.employee), report)
+
+        self.add_jobs(1)
+        self.assertEqual(len(cached_employee_compatibility_report(self.employee)), 3)
+
+        profile = self.employee.userprofile
+        profile.skills = "Python, Docker"
+        profile.save()
+        self.assertEqual(cached_employee_compatibility_report(self.employee)[0]["Skills Compatibility"], 100.0)
+
+    def add_candidate(self, skills='Python'):
+        user = User.objects.create_user(email=f'candidate{User.objects.count()}@example.com', password='secret')
+        return UserProfile.objects.create(
+            user=user, role='employee', full_name=f'Candidate {user.id}', contact_number=f'3{user.id}',
+            resume='resumes/candidate.pdf', education='B.Tech', skills=skills, experience_years=2,
+        )
+
+    def rescored_pairs(self):
+        return set(CompatibilityScore.objects.exclude(overall=-1).values_list('job_id', 'profile_id'))
+
+    def test_saves_rescore_only_their_pairs(self):
+        self.add_jobs(3)
+        candidate = self.add_candidate()
+        profile_ids = {self.employee.userprofile.id, candidate.id}
+        job_ids = set(Job.objects.values_list('id', flat=True))
+        self.assertEqual(CompatibilityScore.objects.count(), 6)
+
+        CompatibilityScore.objects.update(overall=-1)
+        job = Job.objects.order_by('id').first()
+        job.save()
+        self.assertEqual(self.rescored_pairs(), {(job.id, profile_id) for profile_id in profile_ids})
+
+        CompatibilityScore.objects.update(overall=-1)
+        candidate.skills = 'Python, Docker'
+        candidate.save()
+        self.assertEqual(self.rescored_pairs(), {(job_id, candidate.id) for job_id in job_ids})
+        self.assertEqual(set(CompatibilityScore.objects.filter(profile=candidate).values_list('skills', flat=True)), {100.0})
+
+        candidate.resume = ''
+        candidate.save()
+        self.assertFalse(CompatibilityScore.objects.filter(profile=candidate).exists())
+        self.assertEqual(CompatibilityScore.objects.count(), 3)
+
+    def test_scores_of_older_versions_are_recomputed(self):
+        self.add_jobs(2)
+        jobs = list(Job.objects.select_related('features'))
+        profiles = scored_profiles()
+        current = stored_scores(jobs, profiles)
+
+        CompatibilityScore.objects.update(overall=-1, algorithm_version=SCORING_ALGORITHM_VERSION - 1)
+        self.assertEqual(stored_scores(jobs, profiles), {})
+        self.assertEqual(get_scores(jobs, profiles), current)
+        self.assertEqual(set(CompatibilityScore.objects.values_list('algorithm_version', flat=True)), {SCORING_ALGORITHM_VERSION})
+        self.assertEqual(stored_scores(jobs, profiles), current)
+
+    def test_synonym_rebuild_rescores_stored_pairs(self):
+        self.add_jobs(1)
+        self.assertEqual(CompatibilityScore.objects.get().skills, 50.0)
+        self.addCleanup(rebuild_synonym_graph)
+
+        # At threshold 0 every skill is a synonym of every other
+        rebuild_synonym_graph(threshold=0)
+        self.assertEqual(CompatibilityScore.objects.get().skills, 100.0)
+
+    def test_synonym_rebuild_rebuilds_recommendations(self):
+        self.add_jobs(3)
+        profile = self.employee.userprofile
+        before = set(profile.recommendations.values_list('score', flat=True))
+        self.addCleanup(rebuild_synonym_graph)
+
+        rebuild_synonym_graph(threshold=0)
+        after = set(profile.recommendations.values_list('score', flat=True))
+        self.assertNotEqual(after, before)
+        self.assertEqual(after, set(CompatibilityScore.objects.filter(profile=profile).values_list('overall', flat=True)))
+        response = self.client.get('/view-recommendations/')
+        self.assertEqual(len(response.context['recommended_jobs']), 3)
+
+    def test_candidate_jobs_follow_skill_index(self):
+        candidate = self.add_candidate('PostgreSQL')
+        # Jobs asking for a PhD fail the education gate, so only a shared skill makes them candidates
+        synonym = self.add_job(skills='Postgre SQL', education='PhD in Physics')
+        unrelated = self.add_job(skills='Java', education='PhD in Physics')
+        gated = self.add_job(skills='Java', education='B.Tech')
+        candidates = lambda: candidate_job_ids(UserProfile.objects.get(id=candidate.id).features)
+        self.assertEqual(candidates(), {synonym.id, gated.id})
+
+        synonym.skills = 'Java'
+        synonym.save()
+        self.assertEqual(candidates(), {gated.id})
+
+        candidate.skills = 'Java'
+        candidate.save()
+        self.assertEqual(candidates(), {synonym.id, unrelated.id, gated.id})
+
+    def test_pruned_jobs_get_exact_scores(self):
+        self.add_jobs(2)
+        pruned = self.add_job(skills='Java', education='PhD in Physics', experience='5 years')
+        profile = self.employee.userprofile
+        self.assertNotIn(pruned.id, candidate_job_ids(profile.features))
+        exact = generate_employee_compatibility_report(self.employee, prefilter=False)
+
+        CompatibilityScore.objects.all().delete()
+        report = generate_employee_compatibility_report(self.employee)
+        self.assertEqual(report, exact)
+        entry = next(entry for entry in report if entry["job_id"] == pruned.id)
+        self.assertEqual(
+            {key: entry[key] for key in ("Education Compatibility", "Skills Compatibility", "Experience Compatibility")},
+            {"Education Compatibility": 50.0, "Skills Compatibility": 0.0, "Experience Compatibility": 60.0},
+        )
+
+        # The pruned job's exact score is stored, so the next report reads it back without rescoring
+        self.assertEqual(stored_scores([pruned], [profile])[(pruned.id, profile.id)]["overall_compatibility"], entry["Overall Compatibility"])
+        with mock.patch('main.scoring.score_matrix') as score_matrix_mock:
+            self.assertEqual(generate_employee_compatibility_report(self.employee), exact)
+        score_matrix_mock.assert_not_called()
+
+    def test_matrix_window_endpoint(self):
+        self.add_job(company_name='Alpha', skills='Python, SQL')
+        alpha = self.add_job(company_name='Alpha', skills='Java')
+        beta = self.add_job(company_name='Beta')
+        self.add_job(company_name='Gamma', skills='Go')
+        candidate = self.add_candidate('Go')
+        user = User.objects.create_user(email='noresume@example.com', password='secret')
+        UserProfile.objects.create(user=user, role='employee', full_name='Nora', contact_number='500', skills='Python')
+        self.client.force_login(self.employer)
+        window = lambda **params: self.client.get('/compatibility-report-data/', params).json()
+        companies = lambda data: [row['company'] for row in data['rows']]
+
+        data = window()
+        self.assertEqual((data['rows_total'], data['columns_total']), (3, 2))
+        self.assertEqual(companies(data), ['Alpha', 'Beta', 'Gamma'])
+        self.assertEqual(data['rows'][0]['job_id'], alpha.id)
+        # Employees without a resume are not columns
+        self.assertEqual([column['full_name'] for column in data['columns']], ['Asha', candidate.full_name])
+        self.assertEqual(data['rows'][1]['scores'], [
+            CompatibilityScore.objects.get(job=beta, profile=profile).overall
+            for profile in (self.employee.userprofile, candidate)
+        ])
+        self.assertEqual(companies(window(order='desc')), ['Gamma', 'Beta', 'Alpha'])
+
+        # Score orders follow the latest job of each company, the one the cells show
+        self.assertEqual(companies(window(sort='score', order='desc')), ['Gamma', 'Beta', 'Alpha'])
+        self.assertEqual(companies(window(sort='score')), ['Alpha', 'Beta', 'Gamma'])
+        self.assertEqual(window(column_sort='score')['columns'][0]['full_name'], candidate.full_name)
+
+        data = window(row_offset=1, row_limit=1, column_offset=1, column_limit=1)
+        self.assertEqual(companies(data), ['Beta'])
+        self.assertEqual(data['columns'], [{'user_id': candidate.user_id, 'full_name': candidate.full_name}])
+        self.assertEqual(data['rows'][0]['scores'], [60.0])
+
+        data = window(search='ET')
+        self.assertEqual((companies(data), data['rows_total']), (['Beta'], 1))
+
+        with mock.patch('main.compatibility.MATRIX_WINDOW_MAX_ROWS', 2), \
+                mock.patch('main.compatibility.MATRIX_WINDOW_MAX_COLUMNS', 1):
+            data = window(row_limit=1000, column_limit=1000)
+        self.assertEqual((len(data['rows']), len(data['columns'])), (2, 1))
+
+        for params in ({'row_offset': 'x'}, {'sort': 'bogus'}, {'column_sort': 'bogus'}):
+            self.assertEqual(self.client.get('/compatibility-report-data/', params).status_code, 400)
+        with mock.patch('main.views.generate_clustered_bar_chart') as chart:
+            response = self.client.get('/compatibility-report/', {'search': 'et'})
+            self.assertEqual([row['company'] for row in response.context['window']['rows']], ['Beta'])
+            self.assertIsNone(response.context['filtered_message'])
+            # The chart covers the window on the page
+            self.assertEqual(list(chart.call_args[0][0].columns), ['Beta'])
+
+            response = self.client.get('/compatibility-report/', {'search': 'Initech'})
+            self.assertEqual(response.context['filtered_message'], "No company found matching 'Initech'. Displaying all companies.")
+            self.assertEqual(companies(response.context['window']), ['Alpha', 'Beta', 'Gamma'])
+            self.assertEqual(chart.call_args[0][0].shape, (2, 3))
+        self.assertContains(response, '/compatibility-report-data/')
+
+    def test_experience_filters_keep_rows_without_features(self):
+        candidate = self.add_candidate()
+        junior = self.add_candidate()
+        UserProfile.objects.filter(id=junior.id).update(experience_years=1)
+        ProfileFeatures.objects.filter(profile__in=[candidate, junior]).delete()
+        self.assertEqual(
+            [profile.id for profile in scored_profiles(min_experience=2)], [self.employee.userprofile.id, candidate.id],
+        )
+        self.assertTrue(ProfileFeatures.objects.filter(profile=candidate).exists())
+
+        job = self.add_job()
+        senior_job = self.add_job(experience='5 years')
+        JobFeatures.objects.filter(job__in=[job, senior_job]).delete()
+        report = generate_employee_compatibility_report(self.employee, experience_met_only=True)
+        self.assertEqual([entry["job_id"] for entry in report], [job.id])
+
+    def test_streaming_export_matches_stored_scores(self):
+        self.add_jobs(3)
+        response = self.client.get('/download-compatibility-scores/')
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(","), EXPORT_FIELDS)
+        self.assertEqual(len(lines), 4)
+
+        response = self.client.get('/download-compatibility-scores/?format=ndjson')
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row["job_id"] for row in rows], sorted(Job.objects.values_list('id', flat=True)))
+        self.assertEqual({row["skills_compatibility"] for row in rows}, {50.0})
+
+    def test_top_candidates_match_full_ranking(self):
+        self.add_jobs(1)
+        job = Job.objects.get()
+        for index, skills in enumerate(['Docker', 'Java', 'Python, Docker', 'Go', 'Python']):
+            user = User.objects.create_user(email=f'candidate{index}@example.com', password='secret')
+            UserProfile.objects.create(
+                user=user, role='employee', full_name=f'Candidate {index}', contact_number=f'3{index}',
+                resume='resumes/candidate.pdf', education='B.Tech', skills=skills, experience_years=index,
+            )
+        profiles = scored_profiles()
+        full = compute_scores([job], profiles)
+        expected = sorted(profiles, key=lambda profile: -full[(job.id, profile.id)]["overall_compatibility"])
+
+        CompatibilityScore.objects.all().delete()
+        ranked = top_candidates(job, 3, min_score=65)
+        self.assertEqual(
+            [profile.id for profile, _ in ranked],
+            [profile.id for profile in expected if full[(job.id, profile.id)]["overall_compatibility"] >= 65][:3],
+        )
+        # Candidates whose skills bound misses the cutoff are never scored
+        self.assertLess(CompatibilityScore.objects.count(), len(profiles))
+        self.assertEqual(top_candidates(job, 2)[0][1], full[(job.id, expected[0].id)])
+
+    def test_profile_formatting_is_page_scoped_and_cached(self):
+        for index in range(12):
+            user = User.objects.create_user(email=f'profile{index}@example.com', password='secret')
+            UserProfile.objects.create(
+                user=user, role='employee', full_name=f'Profile {index}', contact_number=f'4{index}',
+                education='B.Tech', skills='Python', experience_years=index,
+            )
+        with mock.patch('main.utils.format_education', wraps=format_education) as formatter:
+            self.count_queries('/view-employee-profiles/')
+            self.assertEqual(formatter.call_count, 10)
+            self.count_queries('/view-employee-profiles/')
+            self.assertEqual(formatter.call_count, 10)
+
+            profile = UserProfile.objects.get(full_name='Profile 11')
+            profile.education = 'MBA'
+            profile.save()
+            response = self.client.get('/view-employee-profiles/')
+            self.assertEqual(formatter.call_count, 11)
+            self.assertEqual(response.context['employee_profiles'][0].formatted_education, format_education('MBA'))
+
+    def test_keyset_pages_cover_listing_once(self):
+        self.add_jobs(45)
+        # Identical timestamps leave only the id to order by
+        Job.objects.update(created_at=Job.objects.first().created_at)
+
+        ids, pages, cursor = [], [], None
+        while True:
+            response = self.client.get('/view-jobs/', {'format': 'json', **({'after': cursor} if cursor else {})})
+            page = response.json()
+            pages.append(page)
+            ids.extend(job["id"] for job in page["results"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(ids, sorted(Job.objects.values_list('id', flat=True), reverse=True))
+        self.assertEqual([len(page["results"]) for page in pages], [20, 20, 5])
+
+        previous = self.client.get('/view-jobs/', {'format': 'json', 'before': pages[2]["previous_cursor"]}).json()
+        self.assertEqual(previous["results"], pages[1]["results"])
+        self.assertEqual(self.client.get('/view-jobs/', {'format': 'json', 'after': 'bogus'}).status_code, 400)
+
+    def test_recommendation_snapshots_follow_job_changes(self):
+        self.add_jobs(12)
+        profile = self.employee.userprofile
+        snapshot = lambda: list(profile.recommendations.order_by('rank').values_list('job_id', 'score'))
+        self.assertEqual(len(snapshot()), 10)
+
+        best = Job.objects.create(
+            employer=self.employer, company_name='Best', job_description='-', role='Developer',
+            industry_type='IT', department='Engineering', employment_type='Full Time', role_category='Dev',
+            education='B.Tech', skills='Python, SQL', experience='1-2 years', location='Pune',
+        )
+        self.assertEqual(snapshot()[0], (best.id, 100.0))
+        self.assertEqual(len(snapshot()), 10)
+
+        best.delete()
+        self.assertNotIn(best.id, [job_id for job_id, _ in snapshot()])
+        self.assertEqual(len(snapshot()), 10)
+
+        before = snapshot()
+        rebuild_recommendations()
+        self.assertEqual(snapshot(), before)
+        response = self.client.get('/view-recommendations/')
+        self.assertEqual([job['id'] for job in response.context['recommended_jobs']], [job_id for job_id, _ in before])
@@ -33,9 +33,13 @@ urlpatterns = [
     
     # For generating the compatibility report page (filtered results, tables, etc.)
     path('compatibility-report/', views.compatibility_report_view, name='generate_compatibility_report'),
+    path('compatibility-report-data/', views.compatibility_report_data, name='compatibility_report_data'),
     path('view-compatibility-scores/', views.view_compatibility_scores, name='view_compatibility_scores'),
     path('download-compatibility-scores/', views.download_compatibility_scores, name='download_compatibility_scores'),
+    path('download-employer-compatibility-scores/', views.download_employer_compatibility_scores, name='download_employer_compatibility_scores'),
     path('compatibility-report/<str:job_name>/', views.view_employee_compatibility_report, name='view_employee_compatibility_report'),
+    path('job-compatibility/<int:job_id>/', views.view_employee_job_compatibility, name='view_employee_job_compatibility'),
+    path('job-compatibility-report/<int:job_id>/', views.view_compatibility_report, name='view_compatibility_report'),
 
 
     #openai
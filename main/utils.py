@@ -2,11 +2,13 @@ import logging
 import math
 import os , re
 from django.conf import settings
+from django.db.models import Q
 import pandas as pd
 import matplotlib.pyplot as plt
 from .models import Job, UserProfile
 from fuzzywuzzy import fuzz  # For education matching
-from .helpers import preprocess_text, extract_text_from_file
+from .helpers import preprocess_text, extract_text_from_file, LRUCache
+from .skills import SKILL_VOCABULARY, canonicalize_skill
 
 # Directories for caching and reports
 CACHE_DIR = os.path.join(settings.BASE_DIR, 'main', 'cache')
@@ -20,6 +22,12 @@ logging.getLogger('matplotlib').setLevel(logging.ERROR)
 
 EXCLUDED_USERS = ["vinaybharadwaj", "admin"]
 
+# Experience requirement patterns, checked in this order
+EXPERIENCE_RANGE_PATTERN = re.compile(r'(\d+)(?:\s*-|\s+to\s+)(\d+)')  # "2-5 years", "2 to 5 years"
+EXPERIENCE_YEARS_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(?:years?|yrs?)')  # "2 years"
+EXPERIENCE_MIN_PATTERN = re.compile(r'(?:minimum|min|at least)\s*(\d+(?:\.\d+)?)')  # "minimum 2", "at least 2"
+EXPERIENCE_MONTHS_PATTERN = re.compile(r'\b(?:months?|mos?)\b')
+
 
 # Use Django's MEDIA_ROOT which is already defined in your settings.py
 BASE_RESUME_PATH = os.path.join(settings.MEDIA_ROOT, "resumes")
@@ -35,90 +43,106 @@ def validate_file_path(file_path):
     return True
 
 
-def compare_resume_with_job(resume_details, job_details):
+def skill_key_list(details, use_ids):
     """
-    Compare resume details with job requirements and calculate compatibility scores.
+    Return one match key per entry of details["skills"]: the synonym group id
+    from the skill vocabulary when use_ids, otherwise the canonical name.
     """
-    try:
-        # Normalize education for comparison purposes
-        resume_educations = normalize_education(resume_details["education"])
-        job_educations = normalize_education(job_details["education"])
-        
-        # Education comparison using normalized education (keep this as is)
-        education_match = compare_education(
-            resume_details["education"], 
-            job_details["education"]
-        )
+    if use_ids:
+        return SKILL_VOCABULARY.group_ids(details["skill_ids"])
+    return [canonicalize_skill(skill) for skill in details["skills"]]
 
-        # Rest of the function remains the same
-        # Extract minimum required experience from the job details (handle experience ranges)
+
+def skill_match_keys(resume_details, job_details):
+    """
+    Return the (resume, job) skill sets to intersect: synonym group ids when
+    both sides carry interned skill ids, otherwise canonical skill names.
+    """
+    use_ids = resume_details.get("skill_ids") is not None and job_details.get("skill_ids") is not None
+    return set(skill_key_list(resume_details, use_ids)), set(skill_key_list(job_details, use_ids))
+
+
+def calculate_match_components(resume_details, job_details):
+    """
+    Calculate the raw education, skills and experience matches for one pair.
+
+    Returns:
+        tuple: (education_match, skills_score, experience_match, job_experience),
+        the matches between 0 and 1 and the minimum required experience.
+    """
+    # Education comparison using normalized education (keep this as is)
+    education_match = compare_education(
+        resume_details["education"], 
+        job_details["education"]
+    )
+
+    # Extract minimum required experience from the job details (handle experience ranges)
+    job_experience = job_details.get("min_experience")
+    if job_experience is None:
         job_experience = extract_min_experience(job_details["experience"])
 
-        # If employee's experience is greater than or equal to the required experience, give full match
-        if resume_details["experience_years"] >= job_experience:
-            experience_match = 1.0  # 100%
-        elif resume_details["experience_years"] > 0 and resume_details["experience_years"] < job_experience:
-            experience_match = (resume_details["experience_years"] / job_experience) * 1.0  # Between 0 and 1
-        else:
-            experience_match = 0.0  # 0%
+    # If employee's experience is greater than or equal to the required experience, give full match
+    if resume_details["experience_years"] >= job_experience:
+        experience_match = 1.0  # 100%
+    elif resume_details["experience_years"] > 0 and resume_details["experience_years"] < job_experience:
+        experience_match = (resume_details["experience_years"] / job_experience) * 1.0  # Between 0 and 1
+    else:
+        experience_match = 0.0  # 0%
 
-        # Skill comparison
-        skills_required = set(job_details["skills"])
-        skills_provided = set(resume_details["skills"])
-        matched_skills = skills_required & skills_provided
-        skills_score = (len(matched_skills) / len(skills_required)) if skills_required else 0.0  # Between 0 and 1
+    # Skill comparison on canonical skills, so "Python" and "python " count once
+    skills_provided, skills_required = skill_match_keys(resume_details, job_details)
+    matched_skills = skills_required & skills_provided
+    skills_score = (len(matched_skills) / len(skills_required)) if skills_required else 0.0  # Between 0 and 1
 
-        # Identify missing skills
-        missing_skills = skills_required - skills_provided
+    return education_match, skills_score, experience_match, job_experience
+
+
+def score_resume_against_job(resume_details, job_details):
+    """
+    Calculate only the compatibility percentages for one pair.
+
+    Unlike compare_resume_with_job this skips the criteria matrix, education
+    formatting and the upskill recommendation, so it is the one to use for
+    score grids. Build the details with compare_resume_with_job for the pair
+    the user actually opens.
+    """
+    try:
+        education_match, skills_score, experience_match, _ = calculate_match_components(resume_details, job_details)
+        overall_score = calculate_overall_score(education_match, skills_score, experience_match)
+
+        return {
+            "education_compatibility": round(education_match * 100, 2),
+            "skills_compatibility": round(skills_score * 100, 2),
+            "experience_compatibility": round(experience_match * 100, 2),
+            "overall_compatibility": round(overall_score * 100, 2),
+        }
+
+    except Exception as e:
+        logger.error(f"Error scoring resume against job: {e}")
+        return {
+            "education_compatibility": 0, 
+            "skills_compatibility": 0, 
+            "experience_compatibility": 0, 
+            "overall_compatibility": 0, 
+        }
+
+
+def compare_resume_with_job(resume_details, job_details):
+    """
+    Compare resume details with job requirements and calculate compatibility scores
+    together with the detailed criteria matrix and upskill recommendation.
+    """
+    try:
+        education_match, skills_score, experience_match, job_experience = calculate_match_components(
+            resume_details, job_details
+        )
 
         # Overall compatibility - ensure this continues to work
         overall_score = calculate_overall_score(education_match, skills_score, experience_match)
-        
-        # Join normalized educations for internal reference
-        resume_std_education = "; ".join(resume_educations) if resume_educations else "Not Specified"
-        job_std_education = "; ".join(job_educations) if job_educations else "Not Specified"
-        
-        # Format education for display
-        resume_formatted_education = format_education(resume_details["education"])
-        job_formatted_education = format_education(job_details["education"])
-        
-        # Use formatted education for display in the compatibility matrix
-        criteria = [
-            {"Criteria": "Education",
-             "Resume_Details": resume_formatted_education if resume_formatted_education else resume_std_education,
-             "Job_Description_Requirements": job_formatted_education if job_formatted_education else job_std_education,
-             "Match": "Yes" if education_match >= 0.8 else "No",
-             "Comments": "Matches" if education_match >= 0.8 else "Mismatch"
-            },
-            {"Criteria": "Experience (Years)",
-             "Resume_Details": resume_details["experience_years"] if resume_details["experience_years"] > 0 else "0 years",
-             "Job_Description_Requirements": job_experience if job_experience > 0 else "0 years",
-             "Match": "Yes" if experience_match >= 0.8 else "No",
-             "Comments": "Matches" if experience_match >= 0.8 else "Experience mismatch"
-            }
-        ]
-
-        # Add all skills to the compatibility matrix (including those that are missing)
-        for skill in skills_required:
-            resume_skill = skill if skill in skills_provided else "Not Specified"
-            match_status = "Yes" if skill in skills_provided else "No"
-            comments = "Matches" if skill in skills_provided else "Missing"
-
-            # Add skill to the compatibility matrix even if missing
-            criteria.append({
-                "Criteria": skill,
-                "Resume_Details": resume_skill,
-                "Job_Description_Requirements": skill,
-                "Match": match_status,
-                "Comments": comments
-            })
-
-        # Upskill recommendation for missing skills
-        if missing_skills:
-            upskill_recommendation = ", ".join(missing_skills)
-            recommendation_text = f"Upskill in: {upskill_recommendation}. Pursue certifications or additional education to match job requirements."
-        else:
-            recommendation_text = "All required skills are present. No upskill needed."
+
+        criteria, recommendation_text = build_compatibility_criteria(
+            resume_details, job_details, education_match, experience_match, job_experience
+        )
 
         logger.debug(f"Compatibility Matrix: {criteria}")
         logger.debug(f"Overall Compatibility Score: {overall_score}")
@@ -149,6 +173,99 @@ def compare_resume_with_job(resume_details, job_details):
         }
 
 
+def build_compatibility_criteria(resume_details, job_details, education_match, experience_match,
+                                 job_experience=None, resume_educations=None, job_educations=None):
+    """
+    Build the per-criterion compatibility matrix and upskill recommendation for one pair.
+
+    Args:
+        resume_details (dict): Resume education, skills and experience_years.
+        job_details (dict): Job education, skills and experience.
+        education_match (float): Education match between 0 and 1.
+        experience_match (float): Experience match between 0 and 1.
+        job_experience (float, optional): Minimum required experience. Taken from
+            job_details["min_experience"] or parsed if None.
+        resume_educations (list, optional): Already normalized resume education.
+            Taken from resume_details["normalized_education"] or normalized if None.
+        job_educations (list, optional): Already normalized job education.
+            Taken from job_details["normalized_education"] or normalized if None.
+
+    Returns:
+        tuple: (criteria, recommendation_text)
+    """
+    # Prefer values already parsed into the stored scoring features
+    if job_experience is None:
+        job_experience = job_details.get("min_experience")
+    if job_experience is None:
+        job_experience = extract_min_experience(job_details["experience"])
+    if resume_educations is None:
+        resume_educations = resume_details.get("normalized_education")
+    if resume_educations is None:
+        resume_educations = normalize_education(resume_details["education"])
+    if job_educations is None:
+        job_educations = job_details.get("normalized_education")
+    if job_educations is None:
+        job_educations = normalize_education(job_details["education"])
+
+    # Required skills keyed like skill_match_keys, keeping the job's own spelling for display
+    use_ids = resume_details.get("skill_ids") is not None and job_details.get("skill_ids") is not None
+    skills_required = {}
+    for key, skill in zip(skill_key_list(job_details, use_ids), job_details["skills"]):
+        skills_required.setdefault(key, skill)
+    skills_provided = set(skill_key_list(resume_details, use_ids))
+
+    # Identify missing skills
+    missing_skills = [skill for key, skill in skills_required.items() if key not in skills_provided]
+
+    # Join normalized educations for internal reference
+    resume_std_education = "; ".join(resume_educations) if resume_educations else "Not Specified"
+    job_std_education = "; ".join(job_educations) if job_educations else "Not Specified"
+    
+    # Format education for display
+    resume_formatted_education = format_education(resume_details["education"])
+    job_formatted_education = format_education(job_details["education"])
+    
+    # Use formatted education for display in the compatibility matrix
+    criteria = [
+        {"Criteria": "Education",
+         "Resume_Details": resume_formatted_education if resume_formatted_education else resume_std_education,
+         "Job_Description_Requirements": job_formatted_education if job_formatted_education else job_std_education,
+         "Match": "Yes" if education_match >= 0.8 else "No",
+         "Comments": "Matches" if education_match >= 0.8 else "Mismatch"
+        },
+        {"Criteria": "Experience (Years)",
+         "Resume_Details": resume_details["experience_years"] if resume_details["experience_years"] > 0 else "0 years",
+         "Job_Description_Requirements": job_experience if job_experience > 0 else "0 years",
+         "Match": "Yes" if experience_match >= 0.8 else "No",
+         "Comments": "Matches" if experience_match >= 0.8 else "Experience mismatch"
+        }
+    ]
+
+    # Add all skills to the compatibility matrix (including those that are missing)
+    for key, skill in skills_required.items():
+        resume_skill = skill if key in skills_provided else "Not Specified"
+        match_status = "Yes" if key in skills_provided else "No"
+        comments = "Matches" if key in skills_provided else "Missing"
+
+        # Add skill to the compatibility matrix even if missing
+        criteria.append({
+            "Criteria": skill,
+            "Resume_Details": resume_skill,
+            "Job_Description_Requirements": skill,
+            "Match": match_status,
+            "Comments": comments
+        })
+
+    # Upskill recommendation for missing skills
+    if missing_skills:
+        upskill_recommendation = ", ".join(missing_skills)
+        recommendation_text = f"Upskill in: {upskill_recommendation}. Pursue certifications or additional education to match job requirements."
+    else:
+        recommendation_text = "All required skills are present. No upskill needed."
+
+    return criteria, recommendation_text
+
+
 def format_education(education_data):
     """Convert education data to a formatted string"""
     if not education_data:
@@ -419,6 +536,36 @@ def format_experience_projects(experience_data):
     return str(experience_data)
 
 
+def parse_experience_requirement(experience_text):
+    """
+    Parse a job's experience requirement.
+
+    Args:
+        experience_text (str): Raw experience field, e.g. "2-5 years".
+
+    Returns:
+        tuple: (minimum, maximum, unit). The maximum is None unless the text
+        gives a range, and unit is "months" when the text is stated in months,
+        otherwise "years". The numbers are returned as written, not converted.
+    """
+    if not experience_text:
+        return 0, None, "years"
+
+    text = experience_text.lower()
+    unit = "months" if EXPERIENCE_MONTHS_PATTERN.search(text) else "years"
+
+    range_match = EXPERIENCE_RANGE_PATTERN.search(text)
+    if range_match:
+        return float(range_match.group(1)), float(range_match.group(2)), unit
+
+    for pattern in (EXPERIENCE_YEARS_PATTERN, EXPERIENCE_MIN_PATTERN):
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1)), None, unit
+
+    return 0, None, unit
+
+
 def calculate_overall_score(education_match, skills_score, experience_match):
     """
     Calculate the overall compatibility score based on education, skills, and experience weights.
@@ -584,6 +731,131 @@ def create_education_lookup_table():
     return education_lookup
 
 
+# Degree abbreviations like "B.Tech", "b.e." or short words like "mba"
+ABBREVIATION_PATTERN = re.compile(r'\b([A-Za-z](?:\.[A-Za-z])+(?:\.)?|\b[A-Za-z]{1,5}\b)')
+
+# Specialization often follows "in", "of", "with focus on", etc.
+SPECIALIZATION_PATTERNS = [
+    re.compile(r'in\s+([^;,]+)'),
+    re.compile(r'of\s+([^;,]+)'),
+    re.compile(r'with\s+focus\s+on\s+([^;,]+)'),
+    re.compile(r'with\s+specialization\s+in\s+([^;,]+)'),
+    re.compile(r'specializing\s+in\s+([^;,]+)'),
+]
+
+
+class PatternAutomaton:
+    """
+    Aho-Corasick automaton over a fixed set of patterns.
+
+    Reports the value of every pattern occurring in a text, including
+    overlapping ones, in a single pass over the text.
+    """
+
+    def __init__(self, patterns):
+        """
+        Args:
+            patterns (iterable): (pattern, value) pairs.
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for pattern, value in patterns:
+            state = 0
+            for char in pattern:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state].append(value)
+
+        # Breadth-first construction of failure links
+        queue = list(self._goto[0].values())
+        while queue:
+            state = queue.pop(0)
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_values(self, text):
+        """Yield the value of each pattern occurrence found in text."""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                yield from output[state]
+
+
+class EducationIndex:
+    """
+    Prebuilt lookup structures for normalize_education.
+
+    Every lookup returns the same degree the linear scans over the lookup
+    table would, i.e. the earliest matching entry in table order.
+    """
+
+    def __init__(self, lookup_table):
+        self.lookup_table = lookup_table
+        self._values = list(lookup_table.values())
+
+        # Dot-stripped key -> value of the first key with that form
+        self.dotless = {}
+        for key, value in lookup_table.items():
+            self.dotless.setdefault(key.lower().replace('.', ''), value)
+
+        # Keys as standalone words: " key " inside " text "
+        self._keys = PatternAutomaton(
+            (f" {key} ", order) for order, key in enumerate(lookup_table)
+        )
+        # Full forms anywhere in the text
+        self._full_forms = PatternAutomaton(
+            (value.lower(), order) for order, value in enumerate(self._values)
+        )
+
+    def match_abbreviation(self, clean_text):
+        for abbr in ABBREVIATION_PATTERN.findall(clean_text):
+            value = self.dotless.get(abbr.lower().replace('.', ''))
+            if value is not None:
+                return value
+        return None
+
+    def match_key(self, clean_text):
+        order = min(self._keys.iter_values(f" {clean_text} "), default=None)
+        return None if order is None else self._values[order]
+
+    def match_full_form(self, clean_text):
+        order = min(self._full_forms.iter_values(clean_text), default=None)
+        return None if order is None else self._values[order]
+
+    def find_degree(self, clean_text):
+        """Return the normalized degree for clean_text, or None if nothing matches."""
+        if clean_text in self.lookup_table:
+            return self.lookup_table[clean_text]
+        return (self.match_abbreviation(clean_text) or
+                self.match_key(clean_text) or
+                self.match_full_form(clean_text))
+
+
+EDUCATION_INDEX = EducationIndex(create_education_lookup_table())
+
+
+def get_education_index(lookup_table=None):
+    """Return the process-wide index, or a fresh one for a custom lookup table."""
+    if lookup_table is None or lookup_table == EDUCATION_INDEX.lookup_table:
+        return EDUCATION_INDEX
+    return EducationIndex(lookup_table)
+
+
 def normalize_education(education_text, lookup_table=None):
     """
     Normalize education text that may contain multiple qualifications using the lookup table.
@@ -591,19 +863,15 @@ def normalize_education(education_text, lookup_table=None):
     
     Args:
         education_text (str): The education qualification from resume or job description
-        lookup_table (dict, optional): Education lookup table. If None, creates a new one.
+        lookup_table (dict, optional): Education lookup table. If None, uses the prebuilt index.
         
     Returns:
         list: List of standardized education forms found with specializations
     """
-    # Import re module at the function level to ensure it's available
-    import re
-    
     if not education_text:
         return []
-        
-    if lookup_table is None:
-        lookup_table = create_education_lookup_table()
+
+    index = get_education_index(lookup_table)
     
     # Initialize result list to store all normalized educations
     normalized_educations = []
@@ -645,67 +913,14 @@ def normalize_education(education_text, lookup_table=None):
             original_text = part.strip()
             clean_text = original_text.lower()
             
-            # Extract degree and specialization
-            degree_found = False
-            specialization = ""
-            normalized_degree = ""
-            
-            # Try direct match first
-            if clean_text in lookup_table:
-                normalized_degree = lookup_table[clean_text]
-                degree_found = True
-            else:
-                # Look for degree patterns like "B.Tech", "BTech", "Bachelor of Technology"
-                abbr_pattern = r'\b([A-Za-z](?:\.[A-Za-z])+(?:\.)?|\b[A-Za-z]{1,5}\b)'
-                
-                # Find all possible abbreviations in the text
-                abbreviations = re.findall(abbr_pattern, clean_text)
-                
-                # Try to match each abbreviation with our lookup table
-                for abbr in abbreviations:
-                    abbr_clean = abbr.lower().replace('.', '')
-                    for key, value in lookup_table.items():
-                        key_clean = key.lower().replace('.', '')
-                        if abbr_clean == key_clean:
-                            normalized_degree = value
-                            degree_found = True
-                            break
-                    if degree_found:
-                        break
-                
-                # If not found by abbreviation, try to find if any key is contained within the education text
-                if not degree_found:
-                    for abbr, full_form in lookup_table.items():
-                        # Look for standalone abbreviations with word boundaries
-                        if (f" {abbr} " in f" {clean_text} " or 
-                            clean_text.startswith(f"{abbr} ") or 
-                            clean_text.endswith(f" {abbr}") or 
-                            clean_text == abbr):
-                            normalized_degree = full_form
-                            degree_found = True
-                            break
-                
-                # If still not found, check if the full form is contained in the education text
-                if not degree_found:
-                    for abbr, full_form in lookup_table.items():
-                        if full_form.lower() in clean_text:
-                            normalized_degree = full_form
-                            degree_found = True
-                            break
+            # Direct match, then abbreviations like "B.Tech", then standalone keys, then full forms
+            normalized_degree = index.find_degree(clean_text)
             
             # Extract specialization using common patterns
-            if degree_found:
-                # Specialization often follows "in", "of", "with focus on", etc.
-                spec_patterns = [
-                    r'in\s+([^;,]+)', 
-                    r'of\s+([^;,]+)',
-                    r'with\s+focus\s+on\s+([^;,]+)',
-                    r'with\s+specialization\s+in\s+([^;,]+)',
-                    r'specializing\s+in\s+([^;,]+)'
-                ]
-                
-                for pattern in spec_patterns:
-                    match = re.search(pattern, clean_text)
+            if normalized_degree is not None:
+                specialization = ""
+                for pattern in SPECIALIZATION_PATTERNS:
+                    match = pattern.search(clean_text)
                     if match:
                         specialization = match.group(1).strip()
                         break
@@ -720,14 +935,57 @@ def normalize_education(education_text, lookup_table=None):
                 normalized_educations.append(original_text)
     
     # Remove duplicates while preserving order
-    unique_educations = []
-    for edu in normalized_educations:
-        if edu not in unique_educations:
-            unique_educations.append(edu)
-            
-    return unique_educations
+    return list(dict.fromkeys(normalized_educations))
+
+def get_education_level(edu_text):
+    """
+    Rank a normalized education entry: 3 doctoral, 2 master's, 1 bachelor's, 0 other.
+    """
+    edu_lower = edu_text.lower()
+    if any(term in edu_lower for term in ["phd", "doctorate", "doctor of"]):
+        return 3  # Doctoral
+    elif any(term in edu_lower for term in ["master", "post graduate", "postgraduate", "post-graduate", "m.", "ms ", " ms", "mtech", "mca", "mba"]):
+        return 2  # Master's
+    elif any(term in edu_lower for term in ["bachelor", "graduate", "b.", "bs ", " bs", "btech", "be ", " be", "bca"]):
+        return 1  # Bachelor's
+    else:
+        return 0  # Other
+
+
+# Bounded memo of compare_education results; size can be set in settings
+EDUCATION_MATCH_CACHE = LRUCache(maxsize=getattr(settings, 'EDUCATION_MATCH_CACHE_SIZE', 4096))
+
+
+def get_education_cache_stats():
+    """Return hit, miss and eviction counters of the education match cache."""
+    return EDUCATION_MATCH_CACHE.stats()
+
 
 def compare_education(resume_education, job_education):
+    """
+    Compare resume education with job requirements, memoizing results per input pair.
+
+    The cache is keyed on the exact pair of education strings because the
+    "Any Graduate"/"Any Postgraduate" rules look at the raw text as well as
+    its normalized form.
+
+    Args:
+        resume_education (str): Education from resume
+        job_education (str): Required education from job description
+
+    Returns:
+        float: Match score between 0.0 and 1.0
+    """
+    if not isinstance(resume_education, str) or not isinstance(job_education, str):
+        return _compare_education(resume_education, job_education)
+
+    return EDUCATION_MATCH_CACHE.get_or_compute(
+        (resume_education, job_education),
+        lambda: _compare_education(resume_education, job_education)
+    )
+
+
+def _compare_education(resume_education, job_education):
     """
     Compare resume education with job requirements using the lookup table.
     This version handles multiple education qualifications and specializations.
@@ -769,12 +1027,9 @@ def compare_education(resume_education, job_education):
     if not job_education:
         return 1.0  # If no education specified in job, consider it a match
     
-    # Use lookup table for normalization
-    lookup_table = create_education_lookup_table()
-    
     # Get all normalized education qualifications
-    resume_educations = normalize_education(resume_education, lookup_table)
-    job_educations = normalize_education(job_education, lookup_table)
+    resume_educations = normalize_education(resume_education)
+    job_educations = normalize_education(job_education)
     
     # For debug purposes
     # print(f"Resume Educations: Original='{resume_education}', Normalized={resume_educations}")
@@ -811,18 +1066,6 @@ def compare_education(resume_education, job_education):
                 if any(option in resume_edu.lower() for option in job_options):
                     return 1.0
     
-    # Calculate education levels for comparison
-    def get_education_level(edu_text):
-        edu_lower = edu_text.lower()
-        if any(term in edu_lower for term in ["phd", "doctorate", "doctor of"]):
-            return 3  # Doctoral
-        elif any(term in edu_lower for term in ["master", "post graduate", "postgraduate", "post-graduate", "m.", "ms ", " ms", "mtech", "mca", "mba"]):
-            return 2  # Master's
-        elif any(term in edu_lower for term in ["bachelor", "graduate", "b.", "bs ", " bs", "btech", "be ", " be", "bca"]):
-            return 1  # Bachelor's
-        else:
-            return 0  # Other
-    
     # Get maximum education level from resume
     resume_max_level = max([get_education_level(edu) for edu in resume_educations]) if resume_educations else 0
     
@@ -912,36 +1155,10 @@ if __name__ == "__main__":
 
 def extract_min_experience(experience_text):
     """
-    Extract minimum required experience from the job details.
-    This function should be implemented to handle experience ranges like "2-5 years".
+    Extract minimum required experience from the job details, e.g. 2 for "2-5 years".
+    Jobs with stored features already carry this as JobFeatures.min_experience.
     """
-    # This is a placeholder. You should implement this according to your needs.
-    # For example, if experience_text is "2-5 years", it should return 2
-    import re
-    
-    if not experience_text:
-        return 0
-        
-    # Handle ranges like "2-5 years" or "2 to 5 years"
-    range_pattern = r'(\d+)(?:\s*-|\s+to\s+)(\d+)'
-    range_match = re.search(range_pattern, experience_text.lower())
-    if range_match:
-        return float(range_match.group(1))
-    
-    # Handle simple patterns like "2 years"
-    years_pattern = r'(\d+(?:\.\d+)?)\s*(?:years?|yrs?)'
-    years_match = re.search(years_pattern, experience_text.lower())
-    if years_match:
-        return float(years_match.group(1))
-    
-    # Handle patterns like "minimum 2 years" or "at least 2 years"
-    min_pattern = r'(?:minimum|min|at least)\s*(\d+(?:\.\d+)?)'
-    min_match = re.search(min_pattern, experience_text.lower())
-    if min_match:
-        return float(min_match.group(1))
-    
-    return 0
-
+    return parse_experience_requirement(experience_text)[0]
 
 def generate_recommendations(compatibility_matrix, job_details):
     """
@@ -986,13 +1203,18 @@ def generate_recommendations(compatibility_matrix, job_details):
         return ["Unable to generate recommendations."]
 
 
-def generate_detailed_compatibility_report(employer=None, job_id=None):
+def generate_detailed_compatibility_report(employer=None, job_id=None, include_criteria=False, experience_met_only=False):
     """
     Generate a compatibility report for jobs and employees.
 
     Args:
         employer (str): Employer name to filter jobs (optional).
         job_id (int): Specific job ID to filter (optional).
+        include_criteria (bool): Also build the per-pair criteria matrix. Score
+            grids leave this off; use compare_resume_with_job for a single pair.
+        experience_met_only (bool): Only include candidates with at least the
+            job's minimum experience. The database drops candidates below the
+            lowest minimum of the selected jobs before anything is scored.
 
     Returns:
         list: Detailed compatibility report for jobs and employees.
@@ -1000,59 +1222,56 @@ def generate_detailed_compatibility_report(employer=None, job_id=None):
     try:
         # Query jobs
         jobs_query = Job.objects.filter(employer=employer) if employer else Job.objects.all()
+        jobs_query = jobs_query.select_related('features')
         if job_id:
             jobs_query = jobs_query.filter(id=job_id)
 
         logger.debug(f"Jobs Query: {jobs_query}")
 
-        # List of excluded users
-        EXCLUDED_USERS = ["vinaybharadwaj", "admin"]
+        # Employee profiles with a resume, minus excluded users
+        from .compatibility import get_scores, scored_profiles
+        from .features import get_job_features
+        jobs = list(jobs_query)
+        if experience_met_only:
+            lowest_minimum = min((get_job_features(job).min_experience for job in jobs), default=0)
+            profiles = scored_profiles(min_experience=lowest_minimum)
+        else:
+            profiles = scored_profiles()
 
-        # Query user profiles
-        user_profiles = UserProfile.objects.filter(role='employee', resume__isnull=False)
-        detailed_report = []
+        if include_criteria:
+            # Criteria need the unrounded matches, so score the whole matrix in one pass
+            from .features import job_details_from_features, resume_details_from_features
+            jobs_details = [job_details_from_features(job) for job in jobs]
+            resumes_details = [resume_details_from_features(profile) for profile in profiles]
 
-        for job in jobs_query:
-            # Extract job details
-            job_details = {
-                "education": job.education or "Not Specified",
-                "skills": [skill.strip() for skill in (job.skills or "").split(",") if skill.strip()] or ["Not Specified"],
-                "experience": job.experience or "0"
-            }
+            from .scoring import score_matrix
+            matrix = score_matrix(resumes_details, jobs_details)
+        else:
+            # Read the stored scores; only missing pairs are computed
+            stored = get_scores(jobs, profiles)
 
-            for profile in user_profiles:
-                # Skip excluded users based on full_name
-                if profile.full_name.lower() in EXCLUDED_USERS:
-                    logger.debug(f"Skipping excluded user: {profile.full_name}")
+        detailed_report = []
+        for j, job in enumerate(jobs):
+            for i, profile in enumerate(profiles):
+                if experience_met_only and profile.features.experience_years < get_job_features(job).min_experience:
                     continue
-
-                # Extract profile details
-                resume_details = {
-                    "education": profile.education or "Not Specified",
-                    "skills": [skill.strip() for skill in (profile.skills or "").split(",") if skill.strip()] or ["Not Specified"],
-                    "experience_years": profile.experience_years or 0
-                }
-
-                # Compare resume with job requirements
-                compatibility_matrix, scores = compare_resume_with_job(resume_details, job_details)
+                scores = matrix.scores(i, j) if include_criteria else stored[(job.id, profile.id)]
 
                 # Append results to the report
-                detailed_report.append({
+                entry = {
                     "Candidate": profile.full_name,
                     "Job": f"{job.company_name} - {job.role}",
                     "job_id": job.id,  # Include job_id for dynamic URL generation
-                    "Criteria": compatibility_matrix,
                     "Education Compatibility": scores.get("education_compatibility", 0),
                     "Skills Compatibility": scores.get("skills_compatibility", 0),
                     "Experience Compatibility": scores.get("experience_compatibility", 0),
                     "Overall Compatibility": scores.get("overall_compatibility", 0),
-                })
-
-                # Debugging logs
-                logger.debug(f"Job Details: {job_details}")
-                logger.debug(f"Resume Details for {profile.full_name}: {resume_details}")
-                logger.debug(f"Compatibility Matrix: {compatibility_matrix}")
-                logger.debug(f"Scores for {profile.full_name} and Job {job.id}: {scores}")
+                }
+                if include_criteria:
+                    entry["Criteria"], _ = build_compatibility_criteria(
+                        resumes_details[i], jobs_details[j], matrix.education_match[i, j], matrix.experience_match[i, j]
+                    )
+                detailed_report.append(entry)
 
         logger.info("Detailed Report Generated")
         return detailed_report
@@ -1073,7 +1292,7 @@ def display_compatibility_report(report):
         print(f"Candidate: {entry['Candidate']}")
         print(f"Job: {entry['Job']}\n")
         
-        for row in entry["Criteria"]:
+        for row in entry.get("Criteria", []):
             print(
                 f"Criteria: {row['Criteria']}\n"
                 f"Resume Details: {row['Resume Details']}\n"
@@ -1084,9 +1303,20 @@ def display_compatibility_report(report):
         print(f"Overall Compatibility: {entry['Overall Compatibility']}%\n{'-' * 50}\n")
 
 
-def generate_employee_compatibility_report(employee):
+def generate_employee_compatibility_report(employee, include_criteria=False, prefilter=True, experience_met_only=False):
     """
     Generate a compatibility report for the logged-in employee with all posted jobs.
+    With experience_met_only, the database only returns jobs whose minimum
+    experience the employee meets.
+
+    Entries only carry "Criteria" and "Recommendations" when include_criteria
+    is set; pages showing one job should use compare_resume_with_job instead.
+
+    Scores are read from the CompatibilityScore table. With prefilter, jobs
+    without a stored score are run through the skill matrix only if
+    candidate_job_ids returns them; the rest share no skill, so their skills
+    score is 0 and only education and experience are computed. Those scores
+    are exact, so they are stored like the others.
     """
     try:
         if not employee:
@@ -1108,50 +1338,79 @@ def generate_employee_compatibility_report(employee):
         if not employee_profile.resume:
             raise ValueError("Employee does not have a resume uploaded.")
 
-        # Extract resume details
-        resume_details = {
-            "education": employee_profile.education or "Not Specified",
-            "skills": [skill.strip() for skill in (employee_profile.skills or "").split(",")] or ["Not Specified"],
-            "experience_years": employee_profile.experience_years or 0,
-        }
+        from .features import (
+            candidate_job_ids, get_job_features, get_profile_features, job_details_from_features,
+            resume_details_from_features,
+        )
+        from .scoring import score_matrix
+        profile_features = get_profile_features(employee_profile)
 
         # Fetch all available jobs
-        jobs_query = Job.objects.all()
+        jobs_query = Job.objects.select_related('features')
+        if experience_met_only:
+            # Jobs never backfilled have no features row to filter on, so they are checked after computing it
+            jobs_query = jobs_query.filter(
+                Q(features__min_experience__lte=profile_features.experience_years) | Q(features__isnull=True)
+            )
+        jobs = list(jobs_query)
+        if experience_met_only:
+            jobs = [job for job in jobs if get_job_features(job).min_experience <= profile_features.experience_years]
+        resume_details = resume_details_from_features(employee_profile, profile_features)
+
+        if include_criteria:
+            # Criteria need the unrounded matches, so score every job in one pass
+            jobs_details = [job_details_from_features(job) for job in jobs]
+            matrix = score_matrix([resume_details], jobs_details)
+            scores_by_job = {job.id: matrix.scores(0, j) for j, job in enumerate(jobs)}
+        else:
+            # Read the stored scores, then score only the jobs that have none yet
+            from .compatibility import compute_scores, store_scores, stored_scores
+            scores_by_job = {
+                job_id: scores for (job_id, _), scores in stored_scores(jobs, [employee_profile]).items()
+            }
+            missing_jobs = [job for job in jobs if job.id not in scores_by_job]
+            candidate_ids = candidate_job_ids(profile_features) if prefilter and missing_jobs else None
+            exact_jobs = [job for job in missing_jobs if candidate_ids is None or job.id in candidate_ids]
+            scores_by_job.update(
+                (job_id, scores) for (job_id, _), scores in compute_scores(exact_jobs, [employee_profile]).items()
+            )
+
+            # Remaining jobs share no skill, so empty skill keys score them exactly without the skill matrix
+            pruned_jobs = [job for job in missing_jobs if job.id not in scores_by_job]
+            if pruned_jobs:
+                pruned_matrix = score_matrix(
+                    [resume_details],
+                    [job_details_from_features(job) for job in pruned_jobs],
+                    skill_keys=([[]], [[] for _ in pruned_jobs]),
+                )
+                pruned_scores = {(job.id, employee_profile.id): pruned_matrix.scores(0, j) for j, job in enumerate(pruned_jobs)}
+                store_scores(pruned_scores)
+                scores_by_job.update((job_id, scores) for (job_id, _), scores in pruned_scores.items())
 
         # Prepare detailed report
         detailed_report = []
 
-        for job in jobs_query:
+        for j, job in enumerate(jobs):
             company_name = job.company_name.strip()
-
-            # Extract job details
-            job_details = {
-                "education": job.education or "Not Specified",
-                "skills": [skill.strip() for skill in (job.skills or "").split(",")] or ["Not Specified"],
-                "experience": job.experience or "0",
-            }
-
-            # Compare employee resume with job requirements
-            compatibility_matrix, scores = compare_resume_with_job(resume_details, job_details)
-
-            # Generate recommendations for this job
-            recommendations = generate_recommendations(compatibility_matrix, job_details)
+            scores = scores_by_job[job.id]
 
             # Append compatibility results to the report
-            detailed_report.append({
+            entry = {
                 "Job": company_name,
-                "Criteria": compatibility_matrix,
+                "job_id": job.id,
                 "Education Compatibility": scores["education_compatibility"],
                 "Skills Compatibility": scores["skills_compatibility"],
                 "Experience Compatibility": scores["experience_compatibility"],
                 "Overall Compatibility": scores["overall_compatibility"],
-                "Recommendations": recommendations,
-            })
-
-            # Debugging
-            logger.debug(f"Job Details: {job_details}")
-            logger.debug(f"Compatibility Matrix for Job {company_name}: {compatibility_matrix}")
-            logger.debug(f"Recommendations for {company_name}: {recommendations}")
+            }
+            if include_criteria:
+                job_details = jobs_details[j]
+                entry["Criteria"], _ = build_compatibility_criteria(
+                    resume_details, job_details, matrix.education_match[0, j], matrix.experience_match[0, j]
+                )
+                # Generate recommendations for this job
+                entry["Recommendations"] = generate_recommendations(entry["Criteria"], job_details)
+            detailed_report.append(entry)
 
         logger.info("Employee Compatibility Report Generated")
         return detailed_report
@@ -1229,14 +1488,27 @@ def generate_clustered_bar_chart(similarity_df, file_path):
 def recommend_top_jobs(similarity_df, jobs_query, top_n=10):
     """
     Recommend top N jobs for each employee based on compatibility scores.
+
+    Args:
+        similarity_df (pd.DataFrame): Overall scores, one row per employee and
+            one column per job id.
+        jobs_query (QuerySet): Jobs that may be recommended.
+        top_n (int): Jobs per employee.
+
+    Returns:
+        dict: employee -> list of Job, best match first. All employees are
+        ranked in one pass over the matrix and the jobs are fetched with one
+        query.
     """
+    from .scoring import top_n_indices
+
+    top = top_n_indices(similarity_df.to_numpy(), top_n).tolist()
+    job_ids = similarity_df.columns.tolist()
+    jobs = jobs_query.in_bulk({job_ids[column] for columns in top for column in columns})
+
     recommendations = {}
-    for employee in similarity_df.index:
-        sorted_scores = similarity_df.loc[employee].sort_values(ascending=False)
-        top_jobs = sorted_scores.head(top_n).index
-        
-        # Fetch the corresponding jobs based on the top job names
-        recommendations[employee] = jobs_query.filter(company_name__in=top_jobs)
+    for employee, columns in zip(similarity_df.index, top):
+        recommendations[employee] = [jobs[job_ids[column]] for column in columns if job_ids[column] in jobs]
     return recommendations
 
 
@@ -3,6 +3,7 @@ import pandas as pd
 from django.core.paginator import Paginator
 import csv , os
 import re
+import asyncio
 import openai 
 from functools import wraps
 from django.db.models import Q
@@ -13,6 +14,7 @@ import PyPDF2
 from PyPDF2 import PdfReader
 from docx import Document
 from django.utils import timezone
+from django.utils.html import format_html, format_html_join
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.http import HttpResponse, HttpResponseForbidden ,JsonResponse ,Http404
@@ -29,11 +31,15 @@ from .forms import (
     JobApplicationForm
 )
 from .models import User, UserProfile, Job, JobApplication
+from .compatibility import (
+    REPORT_TOP_K, get_scores, is_scored_profile, matrix_window, scored_profiles, top_candidates,
+)
+from .exports import stream_scores
+from .report_cache import attach_formatted_fields, cached_employee_compatibility_report
 from .utils import (
     REPORTS_DIR,
     compare_resume_with_job,
     generate_detailed_compatibility_report,
-    generate_employee_compatibility_report,
     recommend_top_jobs,   
     generate_clustered_bar_chart,
     generate_employee_clustered_chart,
@@ -41,6 +47,10 @@ from .utils import (
     format_education,format_links,format_experience_projects
 )
 from .helpers import preprocess_text, extract_text_from_file
+from .pagination import keyset_page, page_json, request_page
+from .ai_scoring import complete, score_pairs
+from .llm_cache import chat_completion
+from .features import get_job_features, job_details_from_features, resume_details_from_features
 nlp = spacy.load("en_core_web_sm")
 from main.decorators import employee_required
 from django.conf import settings
@@ -124,7 +134,7 @@ def view_employee_profiles(request):
     search_query = request.GET.get('search', '').strip()
 
     # Get employee profiles (excluding employers) with related user
-    employee_profiles = UserProfile.objects.filter(role='employee').select_related('user').order_by('-experience_years')
+    employee_profiles = UserProfile.objects.filter(role='employee').select_related('user').order_by('-experience_years', 'id')
 
     # Filter based on search query - expanded to more fields
     if search_query:
@@ -142,19 +152,14 @@ def view_employee_profiles(request):
             Q(user__email__icontains=search_query)
         )
 
-    # Format data before rendering
-    formatted_profiles = []
-    for profile in employee_profiles:
-        profile.formatted_education = format_education(profile.education)
-        profile.formatted_links = format_links(profile.links)
-        profile.formatted_experience_projects = format_experience_projects(profile.experience_projects)
-        formatted_profiles.append(profile)
-
     # Paginate the results
     paginator = Paginator(employee_profiles, 10)  # Show 10 profiles per page
     page_number = request.GET.get('page')
     profiles_page = paginator.get_page(page_number)
 
+    # Format only the profiles shown on this page, reusing cached output
+    profiles_page.object_list = attach_formatted_fields(profiles_page.object_list)
+
     return render(request, 'main/view_employee_profiles.html', {
         'employee_profiles': profiles_page,
         'search_query': search_query,
@@ -205,10 +210,16 @@ def employer_dashboard(request):
             Q(location__icontains=search_query)
         )
 
-    # Paginate the results
-    paginator = Paginator(posted_jobs, 10)  # Show 10 jobs per page
-    page_number = request.GET.get('page')
-    jobs_page = paginator.get_page(page_number)
+    # Paginate the results by (created_at, id) cursor, 10 jobs per page
+    try:
+        jobs_page = request_page(request, posted_jobs, 'created_at')
+    except ValueError as e:
+        if request.GET.get('format') == 'json':
+            return JsonResponse({'error': str(e)}, status=400)
+        jobs_page = keyset_page(posted_jobs, 'created_at')
+
+    if request.GET.get('format') == 'json':
+        return page_json(jobs_page, job_json)
 
     return render(request, 'main/employer_dashboard.html', {
         'posted_jobs': jobs_page,
@@ -271,7 +282,7 @@ def employee_dashboard(request):
 
     if not incomplete_profile:
         try:
-            detailed_report = generate_employee_compatibility_report(current_employee)
+            detailed_report = cached_employee_compatibility_report(current_employee)
             if not detailed_report:
                 raise ValueError("No compatibility data found for this employee.")
             
@@ -615,6 +626,33 @@ def parse_resume(file):
     print(f"Extracted {len(content)} characters from resume")
     return content
 
+def clean_json_reply(text):
+    """Strip the markdown code fences a model may wrap its JSON reply in."""
+    clean_text = re.sub(r"```(?:json|python)?\n?", "", text or "").strip()
+    return clean_text.replace("```", "").strip()
+
+
+def is_json_reply(text):
+    """Return True if a resume extraction reply parses as a JSON object once cleaned."""
+    try:
+        return isinstance(json.loads(clean_json_reply(text)), dict)
+    except ValueError:
+        return False
+
+
+# Row headings of the report table the compatibility report prompt asks for
+REPORT_TABLE_HEADINGS = (
+    "Overall Compatibility Score", "Skills Compatibility Score", "Experience Compatibility Score",
+    "Skills Match Analysis", "Experience Relevance", "Key Strengths", "Potential Gaps", "Recommendation",
+)
+
+
+def is_report_table(text):
+    """Return True if a compatibility report reply is a complete table with every requested row."""
+    text = text or ""
+    return "<table" in text and "</table>" in text and all(f"{heading}</th>" in text for heading in REPORT_TABLE_HEADINGS)
+
+
 def extract_data_from_resume(resume_text):
     """
     Extract structured data from resume text using OpenAI's API with gpt-3.5-turbo
@@ -661,21 +699,21 @@ def extract_data_from_resume(resume_text):
         """ + resume_text
         
         # Increase token limit for more complete extraction
-        response = client.chat.completions.create(
+        text = chat_completion(
+            client,
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "You are an expert resume parser. Extract all relevant information completely and accurately."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.2,  # Lower temperature for consistency
-            max_tokens=1000  # Increased token limit
+            max_tokens=1000,  # Increased token limit
+            cacheable=is_json_reply,
         )
         
         # Parse the JSON response
-        print("OpenAI Response:", response.choices[0].message.content)
-        text = (response.choices[0].message.content)
-        clean_text = re.sub(r"```(?:json|python)?\n?", "", text).strip()
-        clean_text = clean_text.replace("```", "").strip()
+        print("OpenAI Response:", text)
+        clean_text = clean_json_reply(text)
         # print("result2=======",clean_text)
         # print("type=============",type(response.choices[0].message.content))
         result = json.loads(clean_text)
@@ -962,34 +1000,50 @@ def view_all_jobs(request):
             Q(location__icontains=search_query)
         )
 
-    # Get a set of job IDs the employee has applied for
-    applied_job_ids = set(JobApplication.objects.filter(user=request.user).values_list('job_id', flat=True))
-
-    return render(request, 'main/view_jobs.html', {'jobs': jobs, 'applied_job_ids': applied_job_ids})
+    # Paginate the results by (created_at, id) cursor
+    try:
+        jobs_page = request_page(request, jobs, 'created_at', per_page=20)
+    except ValueError as e:
+        if request.GET.get('format') == 'json':
+            return JsonResponse({'error': str(e)}, status=400)
+        jobs_page = keyset_page(jobs, 'created_at', per_page=20)
+
+    # Get the IDs of the jobs on this page the employee has applied for
+    applied_job_ids = set(JobApplication.objects.filter(
+        user=request.user, job__in=[job.id for job in jobs_page]
+    ).values_list('job_id', flat=True))
+
+    if request.GET.get('format') == 'json':
+        return page_json(jobs_page, lambda job: {**job_json(job), "applied": job.id in applied_job_ids})
+
+    return render(request, 'main/view_jobs.html', {
+        'jobs': jobs_page,
+        'applied_job_ids': applied_job_ids,
+        'search_query': search_query,
+    })
 
 
 @login_required
 @employee_required
 def view_recommendations(request):
-    top_10_scores = request.session.get('top_10_compatibility_scores', [])
-    if not top_10_scores:
-        messages.warning(request, "Please calculate compatibility scores to view Top 10 Job Recommendations.")
-        return render(request, 'main/view_recommendations.html', {'recommended_jobs': []})
-
-    top_10_jobs = []
-    for slug, data in top_10_scores:
-        company_name = data['company_name']
-        compatibility_score = data['score']
-        job_details = Job.objects.filter(company_name__iexact=company_name).first()
-        if job_details:
-            top_10_jobs.append({
-                'id': job_details.id,
-                'company_name': job_details.company_name,
-                'role': job_details.role,
-                'compatibility_score': compatibility_score
-            })
+    # Read the precomputed top jobs in one indexed query
+    recommendations = request.user.userprofile.recommendations.select_related('job').order_by('rank')
+
+    top_10_jobs = [
+        {
+            'id': recommendation.job.id,
+            'company_name': recommendation.job.company_name,
+            'role': recommendation.job.role,
+            'compatibility_score': recommendation.score,
+        }
+        for recommendation in recommendations
+    ]
+    if not top_10_jobs:
+        messages.warning(request, "No job recommendations are available for your profile yet.")
 
-    applied_job_ids = JobApplication.objects.filter(user=request.user).values_list('job_id', flat=True)
+    applied_job_ids = set(JobApplication.objects.filter(
+        user=request.user, job__in=[job['id'] for job in top_10_jobs]
+    ).values_list('job_id', flat=True))
     return render(request, 'main/view_recommendations.html', {
         'recommended_jobs': top_10_jobs,
         'applied_job_ids': applied_job_ids,
@@ -1029,22 +1083,43 @@ def apply_for_job(request, job_id):
 
 
 
-from django.db.models import Prefetch
+from django.db.models import Prefetch, prefetch_related_objects
 from main.models import EmployeeCertification
 
+
+def job_json(job):
+    """Listing fields of a job for the JSON pages."""
+    return {
+        "id": job.id,
+        "company_name": job.company_name,
+        "role": job.role,
+        "location": job.location,
+        "experience": job.experience,
+        "employment_type": job.employment_type,
+        "created_at": job.created_at.isoformat(),
+    }
+
+
+def application_json(application):
+    """Listing fields of an application for the JSON pages."""
+    return {
+        "id": application.id,
+        "job_id": application.job_id,
+        "company_name": application.job.company_name,
+        "full_name": application.user.userprofile.full_name,
+        "email": application.user.email,
+        "applied_on": application.applied_on.isoformat(),
+        "certifications": [certification.certificate_name for certification in application.user.certifications.all()],
+    }
+
 @login_required
 @employer_required
 def view_all_applications(request):
     """
-    View all applications across all jobs posted by the logged-in employer.
-    Optimized with select_related and prefetch_related for user, profile, and certifications.
+    View all applications across all jobs posted by the logged-in employer,
+    paginated like view_applications.
     """
-    applications = JobApplication.objects.filter(job__employer=request.user).select_related(
-        'job', 'user__userprofile'
-    ).prefetch_related(
-        Prefetch('user__certifications', queryset=EmployeeCertification.objects.all())
-    )
-    return render(request, 'main/view_applications.html', {'applications': applications})
+    return view_applications(request)
 
 
 @login_required
@@ -1054,25 +1129,30 @@ def view_applications(request, job_id=None):
     View applications for a specific job (if job_id is provided) or all jobs for the employer.
     """
     try:
+        applications = JobApplication.objects.filter(job__employer=request.user)
         if job_id:
-            applications = JobApplication.objects.filter(
-                job__id=job_id,
-                job__employer=request.user
-            ).select_related(
-                'job', 'user__userprofile'
-            ).prefetch_related(
-                Prefetch('user__certifications', queryset=EmployeeCertification.objects.all())
+            applications = applications.filter(job__id=job_id)
+
+        # Paginate by (applied_on, id) cursor; certifications are prefetched for the page only
+        try:
+            applications_page = request_page(
+                request, applications.select_related('job', 'user__userprofile'), 'applied_on', per_page=20,
             )
-        else:
-            applications = JobApplication.objects.filter(
-                job__employer=request.user
-            ).select_related(
-                'job', 'user__userprofile'
-            ).prefetch_related(
-                Prefetch('user__certifications', queryset=EmployeeCertification.objects.all())
+        except ValueError as e:
+            if request.GET.get('format') == 'json':
+                return JsonResponse({'error': str(e)}, status=400)
+            applications_page = keyset_page(
+                applications.select_related('job', 'user__userprofile'), 'applied_on', per_page=20,
             )
+        prefetch_related_objects(
+            applications_page.object_list,
+            Prefetch('user__certifications', queryset=EmployeeCertification.objects.all()),
+        )
 
-        return render(request, 'main/view_applications.html', {'applications': applications})
+        if request.GET.get('format') == 'json':
+            return page_json(applications_page, application_json)
+
+        return render(request, 'main/view_applications.html', {'applications': applications_page})
     except Exception as e:
         return render(request, 'main/error.html', {"error_message": str(e)})
 
@@ -1214,19 +1294,30 @@ def view_employer_compatibility(request, company, user_id):
 @login_required
 def view_compatibility_report(request, job_id):
     """
-    View Compatibility Report for a specific job posting.
+    View Compatibility Report for a specific job posting: its top candidates,
+    ?top= of them (REPORT_TOP_K by default), optionally only those scoring at
+    least ?min_score= or meeting the experience requirement (?experience_met=1).
     """
     try:
         employer = request.user
-        job = Job.objects.get(id=job_id, employer=employer)
+        job = Job.objects.select_related('features').get(id=job_id, employer=employer)
+
+        try:
+            top = int(request.GET.get('top', REPORT_TOP_K))
+            min_score = request.GET.get('min_score')
+            min_score = float(min_score) if min_score else None
+        except ValueError:
+            return render(request, 'main/error.html', {"error_message": "top and min_score must be numbers."})
 
-        # Generate detailed compatibility report
-        detailed_report = generate_detailed_compatibility_report(employer=employer, job_id=job_id)
+        # Rank only the best candidates, optionally only those meeting the experience requirement
+        min_experience = get_job_features(job).min_experience if request.GET.get('experience_met') == '1' else None
+        ranked = top_candidates(job, top, min_score=min_score, min_experience=min_experience)
 
         # Prepare data for the similarity matrix table and chart
+        company = f"{job.company_name} - {job.role}"
         similarity_data = {
-            entry["Candidate"]: {"Company": entry["Job"], "Overall Compatibility": entry["Overall Compatibility"] / 100}
-            for entry in detailed_report
+            profile.full_name: {"Company": company, "Overall Compatibility": scores["overall_compatibility"] / 100}
+            for profile, scores in ranked
         }
 
         # Generate a DataFrame for visualization
@@ -1244,24 +1335,22 @@ def view_compatibility_report(request, job_id):
         generate_clustered_bar_chart(similarity_df, bar_chart_path)
 
         # Convert similarity data into a format suitable for the table
-        similarity_matrix_table = """
-        <thead>
-            <tr>
-                <th>Candidate</th>
-                <th>Company</th>
-                <th>Overall Compatibility</th>
-            </tr>
-        </thead>
-        <tbody>
-        """
-        for candidate, data in similarity_data.items():
-            similarity_matrix_table += f"<tr><td>{candidate}</td><td>{data['Company']}</td><td>{data['Overall Compatibility']:.2f}</td></tr>"
-        similarity_matrix_table += "</tbody>"
+        rows = format_html_join(
+            "", "<tr><td>{}</td><td>{}</td><td>{}</td></tr>",
+            ((candidate, data["Company"], f"{data['Overall Compatibility']:.2f}") for candidate, data in similarity_data.items()),
+        )
+        similarity_matrix_table = format_html(
+            "<thead><tr><th>Candidate</th><th>Company</th><th>Overall Compatibility</th></tr></thead>"
+            "<tbody>{}</tbody>",
+            rows,
+        )
 
-        return render(request, 'main/compatibility_report.html', {
+        return render(request, 'main/view_compatibility_report.html', {
             "job": job,
             "bar_chart_path": f"/static/reports/compatibility_report_job_{job_id}.png",
             "similarity_matrix": similarity_matrix_table,
+            "top": top,
+            "min_score": min_score,
         })
 
     except Job.DoesNotExist:
@@ -1273,76 +1362,50 @@ def view_compatibility_report(request, job_id):
 
 @login_required
 def compatibility_report_view(request):
+    """
+    Employer compatibility report. Only the first window of companies and
+    employees is built here, for the page and its chart; the page loads
+    further windows from compatibility_report_data, so its cost does not
+    grow with the grid.
+    """
     employer = request.user
-    search_query = request.GET.get('search', '').strip().lower()
+    search_query = request.GET.get('search', '').strip()
+    row_limit, column_limit = 25, 10
 
     try:
-        # Generate detailed compatibility report
-        detailed_report = generate_detailed_compatibility_report(employer=employer)
+        window = matrix_window(employer, row_limit=row_limit, column_limit=column_limit, search=search_query)
 
-        if not detailed_report:
+        # Fall back to every company when the search matches none
+        grid_search = search_query
+        filtered_message = None
+        if search_query and not window["rows"]:
+            filtered_message = f"No company found matching '{search_query}'. Displaying all companies."
+            grid_search = ""
+            window = matrix_window(employer, row_limit=row_limit, column_limit=column_limit)
+
+        if not window["rows"] or not window["columns"]:
             return render(request, 'main/compatibility_report.html', {
                 "error_message": "No compatibility data available.",
+                "search_query": search_query,
             })
 
-        # Filter out specific candidates
-        filtered_report = [
-            entry for entry in detailed_report if entry["Candidate"] != "vinaybharadwaj"
-        ]
-
-        # Extract all unique companies and employees
-        all_companies = list({entry["Job"].split(" - ")[0] for entry in filtered_report})
-        all_employees = [{'full_name': e.full_name, 'user_id': e.user_id} for e in UserProfile.objects.filter(role='employee')]
-
-        # Create the full similarity matrix
-        full_similarity_df = pd.DataFrame(index=all_companies, columns=[e['full_name'] for e in all_employees], dtype=object).fillna({"score": 0, "job_id": None})
-
-        for entry in filtered_report:
-            company = entry["Job"].split(" - ")[0]
-            employee_full_name = entry["Candidate"]
-            score = entry["Overall Compatibility"]
-            job_id = entry.get("job_id")
-            user_id = next((e["user_id"] for e in all_employees if e["full_name"] == employee_full_name), None)
-            full_similarity_df.at[company, employee_full_name] = {"score": score, "job_id": job_id, "user_id": user_id}
-
-        # Handle search query filtering
-        filtered_chart_df = full_similarity_df
-        filtered_similarity_matrix = None
-        filtered_message = None
-
-        if search_query:
-            # Filter companies based on the search query
-            filtered_companies = [c for c in all_companies if search_query in c.lower()]
-            if filtered_companies:
-                filtered_chart_df = full_similarity_df.loc[filtered_companies]
-                filtered_similarity_matrix = filtered_chart_df.to_dict(orient="index")
-            else:
-                filtered_message = f"No company found matching '{search_query}'. Displaying all companies."
-                filtered_chart_df = full_similarity_df
-
-        # Generate the bar chart
-        bar_chart_path = None
-        if not filtered_chart_df.empty:
-            chart_path = os.path.join(settings.STATICFILES_DIRS[0], f"reports/clustered_{employer.userprofile.full_name}.png")
-            generate_clustered_bar_chart(filtered_chart_df.applymap(lambda x: x["score"] if isinstance(x, dict) else 0).T, chart_path)
-            bar_chart_path = f"/static/reports/clustered_{employer.userprofile.full_name}.png"
-
-        # Simplify matrices for rendering
-        def simplify_matrix(matrix):
-            return {company: {employee: (data if isinstance(data, dict) else {"score": 0, "job_id": None, "user_id": next((e["user_id"] for e in all_employees if e["full_name"] == employee), None)}) for employee, data in employees.items()} for company, employees in matrix.items()}
-
-        full_similarity_matrix = simplify_matrix(full_similarity_df.to_dict(orient="index"))
-        if filtered_similarity_matrix is not None:
-            filtered_similarity_matrix = simplify_matrix(filtered_similarity_matrix)
+        # Generate the bar chart for the companies and employees on the first window
+        chart_frame = pd.DataFrame(
+            np.array([row["scores"] for row in window["rows"]]).T,
+            index=[column["full_name"] for column in window["columns"]],
+            columns=[row["company"] for row in window["rows"]],
+        )
+        chart_path = os.path.join(settings.STATICFILES_DIRS[0], f"reports/clustered_{employer.userprofile.full_name}.png")
+        generate_clustered_bar_chart(chart_frame, chart_path)
 
-        # Render the template
         return render(request, 'main/compatibility_report.html', {
-            "bar_chart_path": bar_chart_path,
-            "full_similarity_matrix": full_similarity_matrix,
-            "filtered_similarity_matrix": filtered_similarity_matrix,
+            "bar_chart_path": f"/static/reports/clustered_{employer.userprofile.full_name}.png",
             "search_query": search_query,
+            "grid_search": grid_search,
             "filtered_message": filtered_message,
-            "employees": all_employees,
+            "window": window,
+            "row_limit": row_limit,
+            "column_limit": column_limit,
         })
 
     except Exception as e:
@@ -1350,6 +1413,35 @@ def compatibility_report_view(request):
         return render(request, 'main/error.html', {"error_message": "An error occurred while processing the request."})
 
 
+@login_required
+@employer_required
+def compatibility_report_data(request):
+    """
+    JSON window of the employer compatibility matrix, so large grids can be
+    loaded a block of rows and columns at a time.
+
+    Query parameters: row_offset, row_limit, column_offset, column_limit,
+    search, sort ("company" or "score"), order ("asc" or "desc") and
+    column_sort ("name" or "score").
+    """
+    try:
+        window = matrix_window(
+            request.user,
+            row_offset=int(request.GET.get('row_offset', 0)),
+            row_limit=int(request.GET.get('row_limit', 25)),
+            column_offset=int(request.GET.get('column_offset', 0)),
+            column_limit=int(request.GET.get('column_limit', 25)),
+            search=request.GET.get('search', '').strip(),
+            sort=request.GET.get('sort', 'company'),
+            descending=request.GET.get('order', 'asc') == 'desc',
+            column_sort=request.GET.get('column_sort', 'name'),
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except Exception as e:
+        logger.error(f"Error in compatibility_report_data: {e}")
+        return JsonResponse({'error': 'An error occurred while processing the request.'}, status=500)
+    return JsonResponse(window)
 
 
 @login_required
@@ -1359,31 +1451,31 @@ def employee_report_view(request):
         current_employee = request.user.userprofile.full_name.strip()  # Use full_name instead of username
 
         # Generate detailed report
-        detailed_report = generate_employee_compatibility_report(request.user)
+        detailed_report = cached_employee_compatibility_report(request.user)
         if not detailed_report:
             raise ValueError("No compatibility data found for this employee.")
 
-        # Build similarity DataFrame
+        # Build the similarity DataFrame: one row for this employee, one column per job id
         similarity_df = pd.DataFrame(
-            {entry["Job"]: entry["Overall Compatibility"] for entry in detailed_report},
-            index=[entry["Candidate"] for entry in detailed_report],
-        ).T
-
-        if current_employee not in similarity_df.index:
-            raise ValueError(f"No compatibility data available for employee: {current_employee}")
+            [[entry["Overall Compatibility"] for entry in detailed_report]],
+            index=[current_employee],
+            columns=[entry["job_id"] for entry in detailed_report],
+        )
 
         # Get recommendations
         recommendations = recommend_top_jobs(similarity_df, Job.objects.all())
-        employee_recommendations = recommendations.get(current_employee, [])
 
-        # Generate clustered chart
+        # Generate clustered chart, labelled by company
         clustered_chart_path = os.path.join(REPORTS_DIR, f'{current_employee.replace(" ", "_")}_compatibility_clustered_chart.png')
         if not os.path.exists(REPORTS_DIR):
             os.makedirs(REPORTS_DIR)
-        generate_employee_clustered_chart(similarity_df.loc[current_employee], clustered_chart_path)
+        employee_scores = pd.Series(
+            similarity_df.loc[current_employee].to_numpy(), index=[entry["Job"] for entry in detailed_report],
+        )
+        generate_employee_clustered_chart(employee_scores, clustered_chart_path)
 
         return render(request, 'main/employee_report.html', {
-            'recommendations': employee_recommendations,
+            'recommendations': recommendations,
             'clustered_chart_path': f'/static/reports/{os.path.basename(clustered_chart_path)}',
             'employee_name': current_employee,
         })
@@ -1404,78 +1496,104 @@ def get_url_safe_job_name(company_name):
 @employee_required
 def view_employee_compatibility_report(request, job_name):
     """
-    Fetch and display a detailed compatibility report for a specific job.
+    Fetch and display a detailed compatibility report for a specific job,
+    looked up by its URL-safe company name. Kept for old links; new links use
+    view_employee_job_compatibility with the job id.
     """
     try:
-        current_employee = request.user.userprofile.full_name.strip()  # Use full_name instead of username
-
         # Replace hyphens with spaces and handle special characters to match the original company names
         job_name = job_name.replace('-', ' ').replace('comma', ',').replace('period', '.')
 
-        # Generate the detailed report for the employee
-        detailed_report = generate_employee_compatibility_report(request.user)
-
-        # Log available jobs for debugging
-        logger.debug(f"Available jobs: {[entry['Job'] for entry in detailed_report]}")
-        logger.debug(f"Requested Job: {job_name}")
-
-        # Find the job report by comparing job names in a case-insensitive manner
-        job_report = next((entry for entry in detailed_report if job_name.lower() == entry["Job"].lower()), None)
-
-        if not job_report:
+        # Find the jobs by company name in a case-insensitive manner
+        jobs = list(Job.objects.select_related('features').filter(company_name__iexact=job_name).order_by('id'))
+        if not jobs:
             logger.error(f"No compatibility data found for the job: {job_name}")
             raise ValueError(f"No compatibility data found for the job: {job_name}")
 
-        # Extract company name
-        company_name = job_report["Job"].strip()
-
-        # Log the company for debugging
-        logger.debug(f"Looking for job details for company: {company_name}")
-
-        # Fetch the job details from the database using a case-insensitive match
-        job_details = Job.objects.filter(
-            company_name__iexact=company_name  # Exact match for company name only
-        ).values(
-            'education', 'skills', 'experience'
-        ).first()
+        if len(jobs) == 1:
+            return render_employee_job_compatibility(request, jobs[0])
 
-        if not job_details:
-            logger.error(f"No job details found for company: {company_name}")
-            raise ValueError(f"No job details found for company: {company_name}")
+        # The name is ambiguous: list every opening at the company with its score to pick from
+        user_profile = request.user.userprofile
+        if not user_profile.resume:
+            raise ValueError("Employee does not have a resume uploaded.")
+        scores = get_scores(jobs, [user_profile])
+        return render(request, 'main/view_compatibility_scores.html', {
+            'compatibility_scores': {
+                job.id: job_score_row(job, scores[(job.id, user_profile.id)]["overall_compatibility"]) for job in jobs
+            },
+            'employee_name': user_profile.full_name.strip(),
+        })
 
-        # Prepare job details dictionary
-        job_details_dict = {
-            "education": job_details.get("education", "Not Specified"),
-            "skills": [skill.strip() for skill in (job_details.get("skills", "") or "").split(",")],
-            "experience": job_details.get("experience", "0 - 0")
-        }
+    except Exception as e:
+        logger.error(f"Error in view_employee_compatibility_report: {e}")
+        return render(request, 'main/error.html', {"error_message": str(e)})
 
-        # Extract details for rendering
-        compatibility_matrix = job_report.get("Criteria", [])
-        overall_compatibility = {
-            "education_compatibility": job_report.get("Education Compatibility", 0),
-            "skills_compatibility": job_report.get("Skills Compatibility", 0),
-            "experience_compatibility": job_report.get("Experience Compatibility", 0),
-            "overall_compatibility": job_report.get("Overall Compatibility", 0),
-        }
 
-        # Generate recommendations using the existing function
-        recommendations = generate_recommendations(compatibility_matrix, job_details=job_details_dict)
+@login_required
+@employee_required
+def view_employee_job_compatibility(request, job_id):
+    """
+    Fetch and display a detailed compatibility report for one job, scoring
+    only the logged-in employee against that job.
+    """
+    try:
+        job = Job.objects.select_related('features').filter(id=job_id).first()
+        if not job:
+            raise ValueError("Job not found.")
 
-        # Render the compatibility report
-        return render(request, 'main/employee_side_compatibility_display.html', {
-            "employee_name": current_employee,
-            "company_name": company_name,
-            "compatibility_matrix": compatibility_matrix,
-            "overall_compatibility": overall_compatibility,
-            "recommendations": recommendations,
-        })
+        return render_employee_job_compatibility(request, job)
 
     except Exception as e:
-        logger.error(f"Error in view_employee_compatibility_report: {e}")
+        logger.error(f"Error in view_employee_job_compatibility: {e}")
         return render(request, 'main/error.html', {"error_message": str(e)})
 
-from django.utils.text import slugify
+
+def render_employee_job_compatibility(request, job):
+    """
+    Score the logged-in employee against one job from stored features and
+    render the criteria matrix, scores and recommendations.
+    """
+    user_profile = request.user.userprofile
+    if not user_profile.resume:
+        raise ValueError("Employee does not have a resume uploaded.")
+
+    # Build the detailed criteria matrix for this one pair only
+    job_details_dict = job_details_from_features(job)
+    resume_details = resume_details_from_features(user_profile)
+    compatibility_matrix, scores = compare_resume_with_job(resume_details, job_details_dict)
+
+    overall_compatibility = {
+        "education_compatibility": scores.get("education_compatibility", 0),
+        "skills_compatibility": scores.get("skills_compatibility", 0),
+        "experience_compatibility": scores.get("experience_compatibility", 0),
+        "overall_compatibility": scores.get("overall_compatibility", 0),
+    }
+
+    # Generate recommendations using the existing function
+    recommendations = generate_recommendations(compatibility_matrix, job_details=job_details_dict)
+
+    # Render the compatibility report
+    return render(request, 'main/employee_side_compatibility_display.html', {
+        "employee_name": user_profile.full_name.strip(),
+        "company_name": job.company_name.strip(),
+        "compatibility_matrix": compatibility_matrix,
+        "overall_compatibility": overall_compatibility,
+        "recommendations": recommendations,
+    })
+
+
+def job_score_row(job, overall_compatibility):
+    """One row of the view_compatibility_scores table."""
+    company_name = job.company_name.strip()
+    return {
+        'company_name': company_name,
+        'role': job.role,
+        'url_safe_name': get_url_safe_job_name(company_name),
+        'job_id': job.id,
+        'score': overall_compatibility / 100,
+    }
+
 
 @login_required
 @employee_required
@@ -1484,43 +1602,28 @@ def view_compatibility_scores(request):
         current_employee = request.user.userprofile.full_name.strip()  # Use full_name instead of username
 
         # Generate detailed report
-        detailed_report = generate_employee_compatibility_report(request.user)
+        detailed_report = cached_employee_compatibility_report(request.user)
         if not detailed_report:
             raise ValueError("No compatibility data found for this employee.")
 
-        # Build similarity DataFrame
-        similarity_df = pd.DataFrame(
-            {entry["Job"]: entry["Overall Compatibility"] / 100 for entry in detailed_report},
-            index=[current_employee]
-        ).T
-
-        # Sort compatibility scores
-        compatibility_scores = similarity_df[current_employee].sort_values(ascending=False).to_dict()
-
-        # Prepare data with slugs and details, only storing the company name and score
-        slugified_scores = {}
-        for job, score in compatibility_scores.items():
-            company_name = job.split(" - ")[0].strip()  # Extract the company name only
+        # One entry per job, so companies with several openings list each of them, best scores first
+        entries_by_job = {entry["job_id"]: entry for entry in detailed_report}
+        ranked_entries = sorted(entries_by_job.values(), key=lambda entry: entry["Overall Compatibility"], reverse=True)
 
-            # Generate URL-safe job name
-            url_safe_name = company_name.replace(' ', '-').replace(',', 'comma').replace('.', 'period')
+        # Resolve every job by primary key in one query
+        jobs = Job.objects.in_bulk(entries_by_job)
 
-            # Ensure only valid job entries are included
-            if Job.objects.filter(company_name__iexact=company_name).exists():
-                slugified_scores[slugify(company_name)] = {
-                    'company_name': company_name,
-                    'url_safe_name': url_safe_name,
-                    'score': score
-                }
-            else:
-                logger.error(f"No compatibility data found for the job: {company_name}")
-
-        # Store top 10 compatibility scores in the session
-        top_10_scores = list(slugified_scores.items())[:10]
-        request.session['top_10_compatibility_scores'] = top_10_scores
+        # Prepare data keyed by job id, only storing the company, role and score
+        compatibility_scores = {}
+        for entry in ranked_entries:
+            job = jobs.get(entry["job_id"])
+            if job is None:
+                logger.error(f"No compatibility data found for the job: {entry['Job']}")
+                continue
+            compatibility_scores[job.id] = job_score_row(job, entry["Overall Compatibility"])
 
         return render(request, 'main/view_compatibility_scores.html', {
-            'compatibility_scores': slugified_scores,
+            'compatibility_scores': compatibility_scores,
             'employee_name': current_employee,  # Update the context with full_name
         })
 
@@ -1532,73 +1635,68 @@ def view_compatibility_scores(request):
 @login_required
 @employee_required
 def download_compatibility_scores(request):
+    """
+    Stream the employee's scores against every job as CSV, or NDJSON with
+    ?format=ndjson.
+    """
     try:
-        # Generate compatibility matrix
-        detailed_report = generate_employee_compatibility_report(request.user)
-        if not detailed_report:
+        profile = request.user.userprofile
+        if not is_scored_profile(profile):
             raise ValueError("No compatibility data available for download.")
+        return stream_scores(
+            Job.objects.all(),
+            [profile],
+            request.GET.get('format', 'csv'),
+            "compatibility_scores",
+        )
 
-        # Build DataFrame with full names
-        similarity_df = pd.DataFrame(
-            {entry["Job"]: entry["Overall Compatibility"] for entry in detailed_report},
-            index=[request.user.userprofile.full_name]  # Use full_name instead of username
-        ).T
+    except Exception as e:
+        logger.error(f"Error in download_compatibility_scores: {e}")
+        return render(request, 'main/error.html', {"error_message": str(e)})
 
-        # Prepare CSV response
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="compatibility_scores.csv"'
-        similarity_df.to_csv(response, index=True)
-        return response
+
+@login_required
+@employer_required
+def download_employer_compatibility_scores(request):
+    """
+    Stream every (job, candidate) score of the employer's jobs as CSV, or
+    NDJSON with ?format=ndjson.
+    """
+    try:
+        return stream_scores(
+            Job.objects.filter(employer=request.user),
+            scored_profiles(),
+            request.GET.get('format', 'csv'),
+            "employer_compatibility_scores",
+        )
 
     except Exception as e:
-        logger.error(f"Error in download_compatibility_scores: {e}")
+        logger.error(f"Error in download_employer_compatibility_scores: {e}")
         return render(request, 'main/error.html', {"error_message": str(e)})
 
 
 
 @login_required
 def employer_side_openaiCS(request):
-    # Set OpenAI API key
-    openai.api_key = settings.OPENAI_API_KEY
-
     # Excluded user full names
     EXCLUDED_USERS = ["vinaybharadwaj", "admin"]
 
-    # Fetch all posted jobs for the employer
-    employer_jobs = Job.objects.filter(employer=request.user)
-    compatibility_data = {}
-    employees_set = set()  # To collect unique employee full names
+    # Fetch all posted jobs for the employer, and the employees to score once
+    employer_jobs = list(Job.objects.filter(employer=request.user).order_by('id'))
+    employees = list(UserProfile.objects.filter(role='employee').exclude(full_name__in=EXCLUDED_USERS))
+    employees_set = {employee.full_name.strip() for employee in employees}  # Unique employee full names
 
-    for job in employer_jobs:
-        compatibility_data[job.company_name] = {}
+    # Score every (job, employee) pair concurrently; failed cells hold an error message
+    pairs = {
+        (job.company_name, employee.full_name.strip()): (job.job_description, employee.skills)
+        for job in employer_jobs
+        for employee in employees
+    }
+    scores = score_pairs(pairs, bypass=request.GET.get('refresh') == '1')
 
-        # Fetch employees for compatibility scoring, excluding by full_name
-        employees = UserProfile.objects.filter(role='employee').exclude(full_name__in=EXCLUDED_USERS)
-
-        for employee in employees:
-            # Initialize entry for each employee
-            full_name = employee.full_name.strip()
-            employees_set.add(full_name)
-            compatibility_data[job.company_name][full_name] = None  # Initialize with None
-
-            try:
-                # Call OpenAI API
-                response = openai.ChatCompletion.create(
-                    model="gpt-4",
-                    messages=[
-                        {"role": "system", "content": "You are an AI compatibility scorer."},
-                        {"role": "user", "content": f"Score compatibility between job: {job.job_description} and employee with skills: {employee.skills}. Return a score from 0 to 100."}
-                    ]
-                )
-                score = response['choices'][0]['message']['content'].strip()
-
-                # Store compatibility score
-                compatibility_data[job.company_name][full_name] = float(score)
-
-            except ValueError as e:
-                compatibility_data[job.company_name][full_name] = f"Error: {str(e)}"
-            except Exception as e:
-                compatibility_data[job.company_name][full_name] = f"API Error: {str(e)}"
+    compatibility_data = {job.company_name: {} for job in employer_jobs}
+    for (company_name, full_name), score in scores.items():
+        compatibility_data[company_name][full_name] = score
 
     return render(request, 'main/employer_side_openaiCS.html', {
         'compatibility_data': compatibility_data,
@@ -1614,25 +1712,18 @@ from io import BytesIO
 
 @login_required
 def employer_side_openaiCR(request, job, employee):
-    # Set OpenAI API key
-    openai.api_key = settings.OPENAI_API_KEY
-
     # Fetch job and employee details
     job_obj = get_object_or_404(Job, company_name=job)
     employee_obj = get_object_or_404(UserProfile, full_name=employee)  # Use full_name to fetch
 
     # Call OpenAI for detailed analysis
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are an AI compatibility analysis expert."},
-                {"role": "user", "content": f"Provide a detailed compatibility report between job: {job_obj.job_description} "
-                                            f"and employee with skills: {employee_obj.skills}. Include insights and recommendations."}
-            ]
-        )
-        detailed_report = response['choices'][0]['message']['content'].strip()
-    except openai.error.OpenAIError as e:
+        detailed_report = complete([
+            {"role": "system", "content": "You are an AI compatibility analysis expert."},
+            {"role": "user", "content": f"Provide a detailed compatibility report between job: {job_obj.job_description} "
+                                        f"and employee with skills: {employee_obj.skills}. Include insights and recommendations."}
+        ], bypass=request.GET.get('refresh') == '1')
+    except (openai.OpenAIError, asyncio.TimeoutError) as e:
         return render(request, 'main/error.html', {"error_message": f"OpenAI API error: {str(e)}"})
 
     if 'download' in request.GET:
@@ -1662,9 +1753,6 @@ def employer_side_openaiCR(request, job, employee):
 
 @login_required
 def employee_side_openaiCS(request):
-    # Set OpenAI API key
-    openai.api_key = settings.OPENAI_API_KEY
-
     # Get the logged-in user's profile
     try:
         logged_in_employee = UserProfile.objects.get(user=request.user, role='employee')
@@ -1673,34 +1761,12 @@ def employee_side_openaiCS(request):
             'error': 'You are not authorized to view this page.',
         })
 
-    # Fetch all jobs
-    jobs = Job.objects.all()
-    compatibility_data = {}
-
-    for job in jobs:
-        try:
-            # Call OpenAI API to generate compatibility score for the logged-in employee
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an AI compatibility scorer."},
-                    {"role": "user", "content": f"Score compatibility between job: {job.job_description} "
-                                                f"and employee with skills: {logged_in_employee.skills}. "
-                                                f"Return a score from 0 to 100."}
-                ]
-            )
-            raw_score = response['choices'][0]['message']['content'].strip()
-            # Extract numeric score using regex
-            match = re.search(r'(\d+\.?\d*)', raw_score)
-            if match:
-                score = float(match.group(1))
-                compatibility_data[job.company_name] = score
-            else:
-                compatibility_data[job.company_name] = "Error: No valid score found in the API response."
-
-        except Exception as e:
-            logger.error(f"OpenAI API error for job {job.company_name}: {str(e)}")
-            compatibility_data[job.company_name] = "Error: Unable to fetch compatibility score."
+    # Score the logged-in employee against all jobs concurrently; failed cells hold an error message
+    pairs = {
+        job.company_name: (job.job_description, logged_in_employee.skills)
+        for job in Job.objects.all()
+    }
+    compatibility_data = score_pairs(pairs, bypass=request.GET.get('refresh') == '1')
 
     # Render the template with compatibility data for the logged-in employee
     return render(request, 'main/employee_side_openaiCS.html', {
@@ -1726,16 +1792,12 @@ def employee_side_openaiCR(request, job, employee):
 
     # Call OpenAI to generate detailed compatibility analysis
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are an AI compatibility scorer providing detailed analysis."},
-                {"role": "user", "content": f"Generate a detailed compatibility report between job: {job_obj.job_description} "
-                                            f"and employee with skills: {employee_profile.skills}. Highlight strengths, gaps, "
-                                            f"and areas for improvement. Provide recommendations."}
-            ]
-        )
-        detailed_report = response['choices'][0]['message']['content'].strip()
+        detailed_report = complete([
+            {"role": "system", "content": "You are an AI compatibility scorer providing detailed analysis."},
+            {"role": "user", "content": f"Generate a detailed compatibility report between job: {job_obj.job_description} "
+                                        f"and employee with skills: {employee_profile.skills}. Highlight strengths, gaps, "
+                                        f"and areas for improvement. Provide recommendations."}
+        ], bypass=request.GET.get('refresh') == '1')
     except Exception as e:
         detailed_report = f"Error generating report: {str(e)}"
 
@@ -2069,17 +2131,19 @@ Do not modify this table structure. Keep all <th> and <td> elements exactly as s
                 
                 try:
                     # Updated API call for newer OpenAI client
-                    response = client.chat.completions.create(
+                    report = chat_completion(
+                        client,
                         model="gpt-3.5-turbo",
                         messages=[
                             {"role": "system", "content": "You are a professional HR analyst doing a resume-job description compatibility check. Format your response using the exact HTML structure provided by the user. Do not deviate from the requested format."},
                             {"role": "user", "content": prompt}
                         ],
-                        max_tokens=1500
+                        max_tokens=1500,
+                        cacheable=is_report_table,
                     )
                     
                     # Add the response to our reports collection
-                    compatibility_reports.append(response.choices[0].message.content)
+                    compatibility_reports.append(report)
                     # Close the section
                     compatibility_reports.append("</div>")
                 